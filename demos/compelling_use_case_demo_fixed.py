@@ -46,7 +46,9 @@ from dataclasses import dataclass
 from enum import Enum
 
 # Add the src directory to the path so we can import graphiti_cosmos
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
 
 # Fix for Windows ProactorEventLoop issues
 if platform.system() == 'Windows':
@@ -54,6 +56,33 @@ if platform.system() == 'Windows':
 
 from graphiti_cosmos import GraphitiCosmos, Episode, GraphitiCosmosConfig, EntityType, RelationType
 
+# Search terms (and report headings) behind the customer intelligence report
+CUSTOMER_SEARCHES = (
+    ("CUST_", "Customer profiles and interactions"),
+    ("purchased", "Purchase transactions"),
+    ("browsed", "Customer browsing behavior"),
+    ("support", "Customer service interactions"),
+    ("segment", "Customer segmentation data"),
+)
+
+# Search terms (and report headings) behind the supply chain intelligence report
+SUPPLY_SEARCHES = (
+    ("supply_ops", "Supply chain operations"),
+    ("WOOL_FARM", "Raw material suppliers"),
+    ("MANUFACTURING", "Manufacturing operations"),
+    ("disruption", "Supply disruptions"),
+    ("capacity", "Capacity management"),
+)
+
+# Search terms (and report headings) behind the market intelligence report
+MARKET_SEARCHES = (
+    ("market_trend", "Market trend analysis"),
+    ("social_sentiment", "Social media sentiment"),
+    ("sustainable", "Sustainability trends"),
+    ("demand", "Market demand patterns"),
+    ("competitor", "Competitive analysis"),
+)
+
 @dataclass
 class CustomerProfile:
     customer_id: str
@@ -368,18 +397,12 @@ class IntelligentEcommercePlatform:
         customer_report = ["=== CUSTOMER INTELLIGENCE REPORT ===", f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ""]
         
         try:
-            # Search for actual customer data with specific terms
-            customer_searches = [
-                ("CUST_", "Customer profiles and interactions"),
-                ("purchased", "Purchase transactions"), 
-                ("browsed", "Customer browsing behavior"),
-                ("support", "Customer service interactions"),
-                ("segment", "Customer segmentation data")
-            ]
-            
             total_customer_insights = 0
-            for search_term, description in customer_searches:
-                results = await self.graphiti.search(search_term, limit=5)
+            # Searches are independent; Gremlin concurrency is bounded inside GraphitiCosmos
+            search_results = await asyncio.gather(
+                *(self.graphiti.search(search_term, limit=5) for search_term, _ in CUSTOMER_SEARCHES)
+            )
+            for (search_term, description), results in zip(CUSTOMER_SEARCHES, search_results):
                 if results:
                     customer_report.append(f"{description}:")
                     for i, result in enumerate(results[:3], 1):
@@ -392,7 +415,7 @@ class IntelligentEcommercePlatform:
             customer_report.insert(2, f"Total insights found: {total_customer_insights}")
             
         except Exception as e:
-            error_msg = f"Error retrieving customer insights: {str(e)}"
+            error_msg = f"Error retrieving customer insights: {e}"
             print(f"   • {error_msg}")
             customer_report.append(error_msg)
         
@@ -401,18 +424,11 @@ class IntelligentEcommercePlatform:
         supply_report = ["=== SUPPLY CHAIN INTELLIGENCE REPORT ===", f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ""]
         
         try:
-            # Search for actual supply chain data
-            supply_searches = [
-                ("supply_ops", "Supply chain operations"),
-                ("WOOL_FARM", "Raw material suppliers"),
-                ("MANUFACTURING", "Manufacturing operations"),
-                ("disruption", "Supply disruptions"),
-                ("capacity", "Capacity management")
-            ]
-            
             total_supply_insights = 0
-            for search_term, description in supply_searches:
-                results = await self.graphiti.search(search_term, limit=5)
+            search_results = await asyncio.gather(
+                *(self.graphiti.search(search_term, limit=5) for search_term, _ in SUPPLY_SEARCHES)
+            )
+            for (search_term, description), results in zip(SUPPLY_SEARCHES, search_results):
                 if results:
                     supply_report.append(f"{description}:")
                     for i, result in enumerate(results[:3], 1):
@@ -425,7 +441,7 @@ class IntelligentEcommercePlatform:
             supply_report.insert(2, f"Total insights found: {total_supply_insights}")
             
         except Exception as e:
-            error_msg = f"Error retrieving supply chain insights: {str(e)}"
+            error_msg = f"Error retrieving supply chain insights: {e}"
             print(f"   • {error_msg}")
             supply_report.append(error_msg)
         
@@ -434,18 +450,11 @@ class IntelligentEcommercePlatform:
         market_report = ["=== MARKET INTELLIGENCE REPORT ===", f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ""]
         
         try:
-            # Search for actual market data
-            market_searches = [
-                ("market_trend", "Market trend analysis"),
-                ("social_sentiment", "Social media sentiment"),
-                ("sustainable", "Sustainability trends"),
-                ("demand", "Market demand patterns"),
-                ("competitor", "Competitive analysis")
-            ]
-            
             total_market_insights = 0
-            for search_term, description in market_searches:
-                results = await self.graphiti.search(search_term, limit=5)
+            search_results = await asyncio.gather(
+                *(self.graphiti.search(search_term, limit=5) for search_term, _ in MARKET_SEARCHES)
+            )
+            for (search_term, description), results in zip(MARKET_SEARCHES, search_results):
                 if results:
                     market_report.append(f"{description}:")
                     for i, result in enumerate(results[:3], 1):
@@ -458,7 +467,7 @@ class IntelligentEcommercePlatform:
             market_report.insert(2, f"Total insights found: {total_market_insights}")
             
         except Exception as e:
-            error_msg = f"Error retrieving market insights: {str(e)}"
+            error_msg = f"Error retrieving market insights: {e}"
             print(f"   • {error_msg}")
             market_report.append(error_msg)
         
@@ -484,7 +493,7 @@ class IntelligentEcommercePlatform:
             print(f"   • Graph contains {stats.get('episodes', 0)} episodes, {stats.get('entities', 0)} entities, {stats.get('relationships', 0)} relationships")
                 
         except Exception as e:
-            error_msg = f"Error retrieving graph statistics: {str(e)}"
+            error_msg = f"Error retrieving graph statistics: {e}"
             print(f"   • {error_msg}")
             stats_report.append(error_msg)
         
@@ -502,7 +511,7 @@ class IntelligentEcommercePlatform:
                     f.write('\n'.join(report_content))
                 print(f"   • Saved: {filename}")
             except Exception as e:
-                print(f"   • Error saving {filename}: {str(e)}")
+                print(f"   • Error saving {filename}: {e}")
         
         print("\n✅ Intelligence reports generated and saved to intelligence_reports/ folder!")
         print()
@@ -567,7 +576,7 @@ class IntelligentEcommercePlatform:
                 decision_accuracy = 25
                 
         except Exception as e:
-            print(f"   • Error calculating ROI metrics: {str(e)}")
+            print(f"   • Error calculating ROI metrics: {e}")
             # Fallback values
             supply_chain_improvement = 15
             customer_value_increase = 12
@@ -22,11 +22,14 @@ import platform
 import random
 import sys
 import time
+import traceback
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 # Add the src directory to the path so we can import graphiti_cosmos
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
 
 from graphiti_cosmos import GraphitiCosmos, Episode, GraphitiCosmosConfig
 
@@ -47,13 +50,6 @@ class EcommerceIntelligenceDemo:
         print("🏪 Initializing E-commerce Intelligence Platform...")
         self.graphiti = GraphitiCosmos()
         await self.graphiti.initialize()
-        # Monkey-patch entity creation to sanitize names invalid for Cosmos DB ids
-        original_create_or_update = self.graphiti._create_or_update_entity
-        async def _sanitize_create_or_update(entity, episode_id):
-            # replace invalid id characters
-            entity.name = entity.name.replace('/', '_').replace('\\', '_')
-            return await original_create_or_update(entity, episode_id)
-        self.graphiti._create_or_update_entity = _sanitize_create_or_update
         print("✅ Platform ready!")
         # Load product data
         await self.load_product_catalog()
@@ -352,16 +348,21 @@ class EcommerceIntelligenceDemo:
         print(f"   Entities: {stats['entities']}")
         print(f"   Relationships: {stats['relationships']}")
         
+        # Category, customer and cart-addition searches are independent, so run them together
+        entity_results, trending_relationships = await asyncio.gather(
+            self.graphiti.search_entities_batch(["category", "customer"]),
+            self.graphiti.search_relationships("added")
+        )
+        
         # Analyze popular categories
-        category_results = await self.graphiti.search_entities("category")
+        category_results = entity_results["category"]
         print(f"\n🏷️  Product Categories: {len(category_results)} found")
         
         # Analyze customer engagement
-        customer_results = await self.graphiti.search_entities("customer")
+        customer_results = entity_results["customer"]
         print(f"👥 Active Customers: {len(customer_results)} found")
         
         # Show trending patterns
-        trending_relationships = await self.graphiti.search_relationships("added")
         print(f"🔥 Cart Additions: {len(trending_relationships)} events")
         
         # Simulate insights
@@ -372,7 +373,6 @@ class EcommerceIntelligenceDemo:
     
     async def generate_intelligence_reports(self):
         """Generate and save intelligence reports to a dedicated folder"""
-        import os
         
         print("\n📋 GENERATING INTELLIGENCE REPORTS")
         print("-" * 40)
@@ -540,7 +540,6 @@ class EcommerceIntelligenceDemo:
             
         except Exception as e:
             print(f"❌ Demo error: {e}")
-            import traceback
             traceback.print_exc()
         finally:
             await self.cleanup()
@@ -574,5 +573,4 @@ if __name__ == "__main__":
         print("\n⚠️  Demo interrupted by user")
     except Exception as e:
         print(f"\n❌ Demo error: {e}")
-        import traceback
         traceback.print_exc()
@@ -14,13 +14,17 @@ import asyncio
 import json
 import os
 import platform
+import random
 import sys
 import time
+import traceback
 from datetime import datetime
 from typing import Optional
 
 # Add the src directory to the path so we can import graphiti_cosmos
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
 
 from graphiti_cosmos import GraphitiCosmos, Episode, GraphitiCosmosConfig
 
@@ -296,7 +300,6 @@ class GraphitiInteractiveDemo:
     async def _load_manybirds_data(self):
         """Load Manybirds product data"""
         try:
-            import json
             with open("manybirds_products.json", "r") as f:
                 products = json.load(f)
             
@@ -344,8 +347,6 @@ class GraphitiInteractiveDemo:
         actions = ["developed", "launched", "researched", "collaborated on"]
         projects = ["AI platform", "mobile app", "data analytics tool", "blockchain solution"]
         
-        import random
-        
         for i in range(3):
             person = random.choice(people)
             company = random.choice(companies)
@@ -438,7 +439,6 @@ class GraphitiInteractiveDemo:
     
     def clear_screen(self):
         """Clear the screen"""
-        import os
         os.system('cls' if os.name == 'nt' else 'clear')
     
     async def run(self):
@@ -484,7 +484,6 @@ class GraphitiInteractiveDemo:
             print("\n\n🛑 Demo interrupted by user")
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
-            import traceback
             traceback.print_exc()
         finally:
             await self.cleanup()
@@ -513,7 +513,6 @@ async def extract_entities_with_llm(text):
         
         # Extract from real data response
         result = response.choices[0].message.content
-        import json
         return json.loads(result)
         
     except Exception as e:
@@ -906,7 +905,6 @@ def create_real_data_visualization(real_data, time_index):
             'sample_relationships': real_data['relationships'][:3] if real_data['relationships'] else []
         }
         # Store debug info for later display
-        import streamlit as st
         st.session_state.relationship_debug = debug_info
     
     return fig
@@ -996,9 +994,16 @@ def create_dashboard_view(real_data, time_index):
         'total': len(customers) + len(products) + len(organizations)
     }
     
+    # Count both relationship kinds in one pass, stringifying each type once
+    customer_product = product_org = 0
+    for r in relationships:
+        rel_type = str(r.get('type', ''))
+        customer_product += 'customer' in rel_type
+        product_org += 'supplier' in rel_type
+    
     relationship_counts = {
-        'customer_product': len([r for r in relationships if 'customer' in str(r.get('type', ''))]),
-        'product_org': len([r for r in relationships if 'supplier' in str(r.get('type', ''))]),
+        'customer_product': customer_product,
+        'product_org': product_org,
         'total': len(relationships)
     }
     
@@ -7,11 +7,14 @@ import json
 from datetime import datetime, timezone
 import asyncio
 import random
+from collections import Counter, defaultdict
 from dotenv import load_dotenv
 
 # Import the cosmos connection functions
 import sys
-sys.path.append('../src')
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
 try:
     from graphiti_cosmos import GraphitiCosmos
 except ImportError:
@@ -23,12 +26,43 @@ except ImportError:
 from dotenv import load_dotenv
 load_dotenv()
 
+@st.cache_resource
+def get_gremlin_client():
+    """Gremlin client shared across reruns and sessions, so each query skips the WebSocket handshake"""
+    from gremlin_python.driver import client, serializer
+    
+    endpoint = os.getenv('COSMOS_ENDPOINT', '').strip('"')
+    return client.Client(
+        f'wss://{endpoint}:443/',
+        'g',
+        username=os.getenv('COSMOS_USERNAME', '').strip('"'),
+        password=os.getenv('COSMOS_PASSWORD', '').strip('"'),
+        message_serializer=serializer.GraphSONSerializersV2d0()
+    )
+
+def run_gremlin_query(query):
+    """Run a query on the shared client, reconnecting once if its WebSocket was dropped"""
+    from gremlin_python.driver.protocol import GremlinServerError
+    
+    gremlin_client = get_gremlin_client()
+    try:
+        return gremlin_client.submit(query).all().result()
+    except GremlinServerError:
+        # The server answered, so the connection is fine
+        raise
+    except Exception as e:
+        # Cosmos DB closes idle WebSockets; replace the cached client and retry once
+        print(f"⚠️ Gremlin connection lost ({e}) - reconnecting")
+        get_gremlin_client.clear()
+        try:
+            gremlin_client.close()
+        except Exception:
+            pass
+        return get_gremlin_client().submit(query).all().result()
+
 def test_cosmos_connection():
     """Test Cosmos DB connection and return status"""
     try:
-        import os
-        from gremlin_python.driver import client, serializer
-        
         endpoint = os.getenv('COSMOS_ENDPOINT', '').strip('"')
         username = os.getenv('COSMOS_USERNAME', '').strip('"')
         password = os.getenv('COSMOS_PASSWORD', '').strip('"')
@@ -37,21 +71,21 @@ def test_cosmos_connection():
             return False, "Missing environment variables"
         
         # Test connection
-        test_client = client.Client(
-            f'wss://{endpoint}:443/',
-            'g',
-            username=username,
-            password=password,
-            message_serializer=serializer.GraphSONSerializersV2d0()
-        )
-        result = test_client.submit('g.V().limit(1)').all().result()
-        test_client.close()
+        result = run_gremlin_query('g.V().limit(1)')
         
         return True, f"Connected to {endpoint} with {len(result)} entities accessible"
         
     except Exception as e:
         return False, str(e)
 
+def _property_text(value):
+    """Unwrap a Cosmos DB property (plain, [v], [{'value': v}] or {'value': v}) to stripped text"""
+    if isinstance(value, list):
+        value = value[0] if value else ''
+    if isinstance(value, dict):
+        value = value.get('value', value)
+    return str(value).strip()
+
 def get_entity_name(entity):
     """Safely extract entity name from either direct field or properties"""
     if isinstance(entity, dict):
@@ -66,54 +100,18 @@ def get_entity_name(entity):
         if 'properties' in entity and entity['properties']:
             props = entity['properties']
             
-            # Try name field in properties
+            # Try name field in properties (Cosmos DB array format [{'value': 'Name'}])
             if 'name' in props:
-                name_prop = props['name']
-                # Handle Cosmos DB array format [{'value': 'Name'}]
-                if isinstance(name_prop, list) and name_prop:
-                    if isinstance(name_prop[0], dict) and 'value' in name_prop[0]:
-                        return str(name_prop[0]['value']).strip()
-                    else:
-                        return str(name_prop[0]).strip()
-                elif isinstance(name_prop, dict) and 'value' in name_prop:
-                    return str(name_prop['value']).strip()
-                else:
-                    return str(name_prop).strip()
+                return _property_text(props['name'])
             
             # Try other name-like fields with proper Cosmos DB format handling
             for field in ['title', 'label', 'display_name', 'firstName', 'lastName', 'productName']:
                 if field in props:
-                    field_val = props[field]
-                    if isinstance(field_val, list) and field_val:
-                        if isinstance(field_val[0], dict) and 'value' in field_val[0]:
-                            return str(field_val[0]['value']).strip()
-                        else:
-                            return str(field_val[0]).strip()
-                    elif isinstance(field_val, dict) and 'value' in field_val:
-                        return str(field_val['value']).strip()
-                    else:
-                        return str(field_val).strip()
+                    return _property_text(props[field])
             
             # Try to combine firstName and lastName
-            first_name = ""
-            last_name = ""
-            if 'firstName' in props:
-                fn = props['firstName']
-                if isinstance(fn, list) and fn:
-                    first_name = str(fn[0]['value'] if isinstance(fn[0], dict) else fn[0]).strip()
-                elif isinstance(fn, dict) and 'value' in fn:
-                    first_name = str(fn['value']).strip()
-                else:
-                    first_name = str(fn).strip()
-            
-            if 'lastName' in props:
-                ln = props['lastName']
-                if isinstance(ln, list) and ln:
-                    last_name = str(ln[0]['value'] if isinstance(ln[0], dict) else ln[0]).strip()
-                elif isinstance(ln, dict) and 'value' in ln:
-                    last_name = str(ln['value']).strip()
-                else:
-                    last_name = str(ln).strip()
+            first_name = _property_text(props['firstName']) if 'firstName' in props else ""
+            last_name = _property_text(props['lastName']) if 'lastName' in props else ""
             
             if first_name and last_name:
                 return f"{first_name} {last_name}"
@@ -247,9 +245,6 @@ def detect_entity_type(entity):
 def query_cosmos_entities_sync(label, limit=10):
     """Query Cosmos DB for entities synchronously"""
     try:
-        import os
-        from gremlin_python.driver import client, serializer
-        
         # Cosmos DB connection details from environment (using working configuration)
         endpoint = os.getenv('COSMOS_ENDPOINT', '').strip('"')
         username = os.getenv('COSMOS_USERNAME', '').strip('"')
@@ -261,25 +256,16 @@ def query_cosmos_entities_sync(label, limit=10):
         
         print(f"🔗 Connecting to Cosmos DB: {endpoint}")
         
-        # Create Gremlin client using working configuration
-        gremlin_client = client.Client(
-            f'wss://{endpoint}:443/',
-            'g',
-            username=username,
-            password=password,
-            message_serializer=serializer.GraphSONSerializersV2d0()
-        )
-          # Query for entities with the specified label
+        # Query for entities with the specified label
         query = f"g.V().hasLabel('{label}').limit({limit}).valueMap(true)"
         print(f"🔍 Executing query: {query}")
-        result = gremlin_client.submit(query).all().result()
+        result = run_gremlin_query(query)
         
         entities = []
         for item in result:
             entities.append(item)
         
         print(f"✅ Successfully retrieved {len(entities)} entities of type '{label}' from Cosmos DB")
-        gremlin_client.close()
         return entities
         
     except Exception as e:
@@ -292,9 +278,6 @@ def get_real_ecommerce_data_sync(filter_entity_type="All", entity_limit=20):
     
     # Test connection first
     try:
-        import os
-        from gremlin_python.driver import client, serializer
-        
         endpoint = os.getenv('COSMOS_ENDPOINT', '').strip('"')
         username = os.getenv('COSMOS_USERNAME', '').strip('"')
         password = os.getenv('COSMOS_PASSWORD', '').strip('"')
@@ -304,15 +287,7 @@ def get_real_ecommerce_data_sync(filter_entity_type="All", entity_limit=20):
             return create_synthetic_ecommerce_data(entity_limit)
         
         # Test connection
-        test_client = client.Client(
-            f'wss://{endpoint}:443/',
-            'g',
-            username=username,
-            password=password,
-            message_serializer=serializer.GraphSONSerializersV2d0()
-        )
-        test_result = test_client.submit('g.V().limit(1)').all().result()
-        test_client.close()
+        test_result = run_gremlin_query('g.V().limit(1)')
         print(f"✅ Cosmos DB connection verified - {len(test_result)} test result(s)")
         
     except Exception as e:
@@ -328,16 +303,8 @@ def get_real_ecommerce_data_sync(filter_entity_type="All", entity_limit=20):
         print("🔍 Discovering available entity types in Cosmos DB...")
         all_labels = []
         try:
-            label_client = client.Client(
-                f'wss://{endpoint}:443/',
-                'g',
-                username=username,
-                password=password,
-                message_serializer=serializer.GraphSONSerializersV2d0()
-            )
-            label_result = label_client.submit('g.V().label().dedup()').all().result()
+            label_result = run_gremlin_query('g.V().label().dedup()')
             all_labels = [str(label) for label in label_result]
-            label_client.close()
             print(f"📊 Found entity types in Cosmos DB: {all_labels}")
         except Exception as e:
             print(f"⚠️ Could not get entity labels: {e}")
@@ -419,20 +386,11 @@ def get_real_ecommerce_data_sync(filter_entity_type="All", entity_limit=20):
         relationships = []
         try:
             # Try to get edges/relationships
-            rel_client = client.Client(
-                f'wss://{endpoint}:443/',
-                'g',
-                username=username,
-                password=password,
-                message_serializer=serializer.GraphSONSerializersV2d0()
-            )
-            rel_result = rel_client.submit('g.E().limit(15).valueMap(true)').all().result()
+            rel_result = run_gremlin_query('g.E().limit(15).valueMap(true)')
             
             for rel in rel_result:
                 relationships.append(rel)
                 print(f"✅ Found relationship: {rel.get('label', 'unknown')}")
-            
-            rel_client.close()
         except Exception as e:
             print(f"⚠️ Could not fetch relationships: {e}")
         
@@ -724,7 +682,18 @@ def create_final_3d_visualization(all_entities, all_relationships):
     
     node_positions = {}
     entity_type_added = set()
-      # Add all entities to the 3D space
+    # Add all entities to the 3D space; opacity scales by the newest step, computed once
+    max_step = max((s for _, _, s in all_entities), default=1)
+    
+    # Group once by type: each entity's slot within its type cluster (first one wins for
+    # repeated ids) and the cluster sizes, instead of rescanning all entities per entity
+    type_slots = defaultdict(dict)
+    type_sizes = Counter()
+    for entity, entity_type, _ in all_entities:
+        slot = type_sizes[entity_type]
+        type_slots[entity_type].setdefault(entity.get('id', f'entity_{slot}'), slot)
+        type_sizes[entity_type] += 1
+    
     for i, (entity, entity_type, step) in enumerate(all_entities):
         # Create better clustered layout based on entity type
         type_positions = {
@@ -735,17 +704,11 @@ def create_final_3d_visualization(all_entities, all_relationships):
             'entity': {'base_x': 0, 'base_y': -2, 'spread': 1.0}
         }        
         pos_config = type_positions.get(entity_type, type_positions['entity'])
-        entities_of_type = [(e, et, s) for e, et, s in all_entities if et == entity_type]
         # Find index by comparing entity IDs instead of full objects
-        type_index = 0
-        entity_id = entity.get('id', f'entity_{i}')
-        for idx, (e, et, s) in enumerate(entities_of_type):
-            if e.get('id', f'entity_{idx}') == entity_id:
-                type_index = idx
-                break
+        type_index = type_slots[entity_type].get(entity.get('id', f'entity_{i}'), 0)
         
         # Calculate position within type cluster
-        cluster_size = len(entities_of_type)
+        cluster_size = type_sizes[entity_type]
         if cluster_size == 1:
             x = pos_config['base_x']
             y = pos_config['base_y']
@@ -781,7 +744,6 @@ def create_final_3d_visualization(all_entities, all_relationships):
                 display_name = f"{entity_type.title()} {i+1}"
         
         # Calculate opacity based on step (newer entities more opaque)
-        max_step = max([s for _, _, s in all_entities]) if all_entities else 1
         opacity = 0.7 + 0.3 * (step / max_step)
         
         # Add glow effect for recent entities
@@ -1198,16 +1160,14 @@ if 'demo_running' in st.session_state and st.session_state.demo_running:
                     density = total_relationships / max(total_entities, 1)
                     st.metric("Graph Density", f"{density:.2f}", "📊 Connected" if density > 0.3 else "🔍 Sparse")
                 with col_c:
-                    entity_types = set([et for _, et, _ in st.session_state.entities_added])
+                    entity_types = {et for _, et, _ in st.session_state.entities_added}
                     st.metric("Entity Diversity", f"{len(entity_types)} types", "🌈 Rich" if len(entity_types) > 2 else "📋 Basic")
             
             with analysis_tab2:
                 st.markdown("### 🤖 AI Pattern Recognition")
                 
                 # Generate intelligent insights based on the data
-                entity_types = {}
-                for entity, entity_type, _ in st.session_state.entities_added:
-                    entity_types[entity_type] = entity_types.get(entity_type, 0) + 1
+                entity_types = Counter(entity_type for _, entity_type, _ in st.session_state.entities_added)
                 
                 # Customer analysis
                 if 'customer' in entity_types or 'person' in entity_types:
@@ -1396,9 +1356,7 @@ if 'demo_running' in st.session_state and st.session_state.demo_running:
                 
                 # Entity type breakdown
                 st.markdown("### 📊 Entity Distribution")
-                entity_types = {}
-                for entity, entity_type, _ in st.session_state.entities_added:
-                    entity_types[entity_type] = entity_types.get(entity_type, 0) + 1
+                entity_types = Counter(entity_type for _, entity_type, _ in st.session_state.entities_added)
                 
                 for entity_type, count in entity_types.items():
                     emoji = get_entity_emoji(entity_type)
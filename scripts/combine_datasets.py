@@ -1,7 +1,23 @@
 import json
 import os
+import sys
+from collections import Counter
 from typing import List, Dict, Any
 
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+def write_json(data: Any, path: str) -> None:
+    """Write data as indented UTF-8 JSON, with orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
 def combine_manybirds_datasets(file_paths: List[str], output_file: str = "combined_manybirds_dataset.json") -> None:
     """
     Combine multiple Manybirds JSON datasets into a single file
@@ -30,26 +46,24 @@ def combine_manybirds_datasets(file_paths: List[str], output_file: str = "combin
             print(f"❌ Error loading '{file_path}': {e}")
             continue
     
-    # Remove duplicates based on product ID
-    seen_ids = set()
-    unique_products = []
+    # Remove duplicates based on product ID, keeping the first occurrence
+    # (setdefault checks and records an ID in a single dict probe)
+    products_by_id = {}
     
     for product in combined_products:
         product_id = product.get('id')
-        if product_id not in seen_ids:
-            seen_ids.add(product_id)
-            unique_products.append(product)
-        else:
+        if products_by_id.setdefault(product_id, product) is not product:
             print(f"🔍 Removing duplicate product ID: {product_id}")
     
+    unique_products = list(products_by_id.values())
+    
     # Create combined dataset
     combined_dataset = {
         "products": unique_products
     }
     
     # Save combined dataset
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(combined_dataset, f, indent=2, ensure_ascii=False)
+    write_json(combined_dataset, output_file)
     
     print(f"\n✅ Combined dataset saved to '{output_file}'")
     print(f"📊 Dataset Summary:")
@@ -59,23 +73,24 @@ def combine_manybirds_datasets(file_paths: List[str], output_file: str = "combin
     print(f"  Total images: {sum(len(p.get('images', [])) for p in unique_products)}")
     
     # Show product type breakdown
-    product_types = {}
-    vendors = {}
+    product_types = Counter()
+    vendors = Counter()
     
     for product in unique_products:
-        ptype = product.get('product_type', 'Unknown')
-        vendor = product.get('vendor', 'Unknown')
+        # Only a handful of distinct values - intern them so the counter
+        # lookups compare by identity instead of full string equality
+        ptype = sys.intern(product.get('product_type') or 'Unknown')
+        vendor = sys.intern(product.get('vendor') or 'Unknown')
         
-        product_types[ptype] = product_types.get(ptype, 0) + 1
-        vendors[vendor] = vendors.get(vendor, 0) + 1
+        product_types[ptype] += 1
+        vendors[vendor] += 1
     
+    # One write per breakdown rather than a print per line
     print(f"\n📋 Product Types:")
-    for ptype, count in sorted(product_types.items()):
-        print(f"  {ptype}: {count}")
+    print("\n".join(f"  {ptype}: {count}" for ptype, count in sorted(product_types.items())))
     
     print(f"\n🏷️ Vendors:")
-    for vendor, count in sorted(vendors.items()):
-        print(f"  {vendor}: {count}")
+    print("\n".join(f"  {vendor}: {count}" for vendor, count in sorted(vendors.items())))
 
 def create_sample_datasets():
     """Create smaller sample datasets for testing"""
@@ -89,20 +104,17 @@ def create_sample_datasets():
         
         # Create small sample (5 products)
         small_sample = {"products": products[:5]}
-        with open("manybirds_sample_small.json", 'w', encoding='utf-8') as f:
-            json.dump(small_sample, f, indent=2, ensure_ascii=False)
+        write_json(small_sample, "manybirds_sample_small.json")
         print(f"✅ Created small sample: 5 products")
         
         # Create medium sample (15 products)
         medium_sample = {"products": products[:15]}
-        with open("manybirds_sample_medium.json", 'w', encoding='utf-8') as f:
-            json.dump(medium_sample, f, indent=2, ensure_ascii=False)
+        write_json(medium_sample, "manybirds_sample_medium.json")
         print(f"✅ Created medium sample: 15 products")
         
         # Create large sample (30 products)
         large_sample = {"products": products[:30]}
-        with open("manybirds_sample_large.json", 'w', encoding='utf-8') as f:
-            json.dump(large_sample, f, indent=2, ensure_ascii=False)
+        write_json(large_sample, "manybirds_sample_large.json")
         print(f"✅ Created large sample: 30 products")
 
 def validate_dataset(file_path: str) -> None:
@@ -1,10 +1,89 @@
 import json
+import os
 import random
+import re
+import sys
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from multiprocessing import Pool
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Upper bound on the number of sizes (and therefore variants) per product
+MAX_VARIANTS = 12
+MAX_IMAGES = 8
+
+# Product, option, variant and image IDs taken by a single product at most
+IDS_PER_PRODUCT = 2 + MAX_VARIANTS + MAX_IMAGES
+
+# Datasets at least this large are generated across worker processes
+PARALLEL_THRESHOLD = 2000
+
+# created_at/updated_at/published_at plus two timestamps per variant and image
+TIMESTAMPS_PER_PRODUCT = 3 + 2 * MAX_VARIANTS + 2 * MAX_IMAGES
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S-07:00"
+
+# Title clean-up ("'s's" -> "'s", double spaces) and handle derivation
+TITLE_FIXUPS = re.compile(r"(?<='s)'s| (?= )")
+HANDLE_TRANS = str.maketrans({" ": "-", "(": None, ")": None})
+HANDLE_DASHES = re.compile(r"-{2,}")
+
+# Fixed prefixes of the Manybirds::key = value tags
+TAG_CARBON_SCORE = "Manybirds::carbon-score = "
+TAG_CF_ID = "Manybirds::cfId = color-"
+TAG_COMPLETE = "Manybirds::complete = "
+TAG_EDITION = "Manybirds::edition = "
+TAG_GENDER = "Manybirds::gender = "
+TAG_HUE = "Manybirds::hue = "
+TAG_MASTER = "Manybirds::master = "
+TAG_MATERIAL = "Manybirds::material = "
+TAG_PRICE_TIER = "Manybirds::price-tier = "
+TAG_SILHOUETTE = "Manybirds::silhouette = "
+TAG_CATEGORY = "Manybirds::category = "
+
+# Product type to internal category
+CATEGORY_MAP = {
+    "Shoes": "shoes",
+    "Socks": "socks", 
+    "Apparel": "apparel",
+    "Accessories": "accessories",
+    "Bags": "bags",
+    "Insoles": "insoles",
+    "Laces": "laces",
+    "Care Products": "care products",
+    "Gift Cards": "gift cards",
+    "Underwear": "underwear"
+}
+
+# Base weight range in grams by category
+WEIGHT_RANGES = {
+    'shoes': (280, 520),
+    'socks': (50, 120),
+    'apparel': (150, 400),
+    'accessories': (30, 200),
+    'bags': (200, 800)
+}
 
 class EnhancedManybirdsDataGenerator:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        # Scalar picks go through a private Random instance; numeric draws
+        # are made in bulk per dataset rather than per call
+        self._rand = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
+        self._draws = None
+        self._cursor = 0
+        self._now = None
+        self._timestamp_rolls = iter(())
+        self._columns = self._new_columns()
+        # IDs are handed out sequentially from a random per-run starting point
+        self._next_id = 5_000_000_000_000 + self._rand.randint(0, 10**11)
+
         self.product_types = [
             "Shoes", "Socks", "Accessories", "Apparel", "Bags", "Insoles", 
             "Laces", "Care Products", "Gift Cards", "Underwear"
@@ -44,6 +123,24 @@ class EnhancedManybirdsDataGenerator:
             "bags": ["One Size"],
             "insoles": ["6", "7", "8", "9", "10", "11", "12"]
         }
+        self._size_arrays = {key: np.asarray(values, dtype=object) for key, values in self.sizes.items()}
+        
+        # (category, gender) -> key into self.sizes
+        self._footwear_categories = ("shoes", "insoles")
+        self._size_category_for = {}
+        for gender in self.genders:
+            for category in self._footwear_categories:
+                if gender != "unisex":
+                    self._size_category_for[(category, gender)] = gender
+            for category in ("socks", "apparel", "underwear"):
+                self._size_category_for[(category, gender)] = category
+        
+        # (min, max) number of sizes offered, by category
+        self._num_sizes_range = {
+            "shoes": (6, MAX_VARIANTS),
+            "apparel": (4, 8),
+            "socks": (4, 8)
+        }
         
         # Enhanced pricing by category
         self.base_prices = {
@@ -58,28 +155,9 @@ class EnhancedManybirdsDataGenerator:
             "gift cards": {"min": 25, "max": 500},
             "underwear": {"min": 22, "max": 48}
         }
-
-        # Product name templates by category
-        self.product_templates = {
-            "shoes": [
-                "{brand} {material} {silhouette} - {gender} - {color}",
-                "{material} {silhouette} - {gender}'s - {color} ({sole_type} Sole)",
-                "{color} {material} {silhouette} - {gender}'s Edition",
-                "Eco {material} {silhouette}s - {color} ({gender}'s)",
-                "{material} {silhouette} {gender}'s - {color} {edition}"
-            ],
-            "socks": [
-                "{material} {sock_type} Socks - {color}",
-                "{gender}'s {material} {sock_type} - {color}",
-                "Eco {material} Socks - {color} ({sock_type})",
-                "{color} {material} {sock_type} Socks"
-            ],
-            "apparel": [
-                "{material} {apparel_type} - {gender}'s - {color}",
-                "{color} {material} {apparel_type} - {gender}'s",
-                "Eco {material} {apparel_type} - {color}",
-                "{gender}'s {material} {apparel_type} in {color}"
-            ]
+        self._price_range_for_type = {
+            product_type: self.base_prices.get(self.get_product_category_details(product_type), self.base_prices["accessories"])
+            for product_type in self.product_types
         }
 
         # Additional product attributes
@@ -88,84 +166,185 @@ class EnhancedManybirdsDataGenerator:
         self.sole_types = ["rubber", "cork", "foam", "recycled", "natural", "comfort"]
         self.brands = ["Manybirds", "TinyBirds", "SkyBirds", "EcoBirds", "UrbanBirds"]
 
+        # Title-cased forms used in product names, index-aligned with the lists above
+        self.genders_titled = tuple(g.title() for g in self.genders)
+        self.materials_titled = tuple(m.title() for m in self.materials)
+        self.colors_titled = tuple(c.title() for c in self.colors)
+        self.editions_titled = tuple(e.title() for e in self.editions)
+        self.sole_types_titled = tuple(s.title() for s in self.sole_types)
+        self.sock_types_titled = tuple(s.title() for s in self.sock_types)
+        self.apparel_types_titled = tuple(a.title() for a in self.apparel_types)
+        
+        # Title builders by category; anything else uses _name_generic
+        self._name_builders = {
+            "shoes": self._name_shoes,
+            "socks": self._name_socks,
+            "apparel": self._name_apparel
+        }
+
+    @staticmethod
+    def _new_columns() -> Dict[str, list]:
+        """Empty per-product summary columns, appended to as products are generated"""
+        return {
+            "product_types": [],
+            "vendors": [],
+            "materials": [],
+            "variant_counts": [],
+            "image_counts": []
+        }
+
+    def summarize(self) -> Dict[str, Any]:
+        """Summarize the products generated so far from the summary columns"""
+        columns = self._columns
+        
+        def counts(values: list) -> Dict[str, int]:
+            if not values:
+                return {}
+            keys, totals = np.unique(values, return_counts=True)
+            return dict(zip(keys.tolist(), totals.tolist()))
+        
+        return {
+            "categories": counts(columns["product_types"]),
+            "brands": counts(columns["vendors"]),
+            "materials": counts(columns["materials"]),
+            "variants": int(np.sum(columns["variant_counts"], dtype=np.int64)),
+            "images": int(np.sum(columns["image_counts"], dtype=np.int64))
+        }
+
+    def _prefill(self, num_products: int) -> None:
+        """Draw the numeric random values for a batch of products at once"""
+        rng = self.rng
+        n = num_products
+        self._draws = {
+            "type_idx": rng.integers(0, len(self.product_types), size=n),
+            "base_price": rng.random(size=n),
+            "material_premium": rng.uniform(1.2, 1.5, size=n),
+            "limited_premium": rng.uniform(1.1, 1.3, size=n),
+            "price_variation": rng.uniform(0.98, 1.03, size=(n, MAX_VARIANTS)),
+            "compare_roll": rng.random(size=(n, MAX_VARIANTS)),
+            "compare_mult": rng.uniform(1.15, 1.67, size=(n, MAX_VARIANTS)),
+            "availability": rng.random(size=(n, MAX_VARIANTS)),
+            "weight": rng.random(size=(n, MAX_VARIANTS))
+        }
+        self._cursor = 0
+        self._now = datetime.now()
+        self._timestamp_rolls = iter(rng.random(size=n * TIMESTAMPS_PER_PRODUCT).tolist())
+
+    def _take(self) -> int:
+        """Return the row of pre-drawn values to use for the next product"""
+        if self._draws is None or self._cursor >= len(self._draws["type_idx"]):
+            self._prefill(1)
+        row = self._cursor
+        self._cursor += 1
+        return row
+
     def generate_id(self) -> int:
-        """Generate a random ID in the style of Shopify"""
-        return random.randint(5000000000000, 9999999999999)
+        """Generate a unique ID in the style of Shopify"""
+        self._next_id += 1
+        return self._next_id
 
     def generate_datetime(self, days_ago_min: int = 30, days_ago_max: int = 730) -> str:
         """Generate a random datetime string with more realistic distribution"""
-        # Weight recent dates more heavily
-        if random.random() < 0.4:  # 40% chance of recent date
-            days_ago = random.randint(1, 90)
+        roll = next(self._timestamp_rolls, None)
+        if roll is None:
+            roll = float(self.rng.random())
+        now = self._now or datetime.now()
+        
+        # Weight recent dates more heavily; a single roll picks both the
+        # window and the offset (down to the second) within it
+        if roll < 0.4:  # 40% chance of recent date
+            low, high = 1, 90
+            roll /= 0.4
         else:
-            days_ago = random.randint(days_ago_min, days_ago_max)
+            low, high = days_ago_min, days_ago_max
+            roll = (roll - 0.4) / 0.6
         
-        dt = datetime.now() - timedelta(days=days_ago)
-        # Add some time variation
-        hours = random.randint(0, 23)
-        minutes = random.randint(0, 59)
-        seconds = random.randint(0, 59)
-        dt = dt.replace(hour=hours, minute=minutes, second=seconds)
-        return dt.strftime("%Y-%m-%dT%H:%M:%S-07:00")
+        seconds_ago = int((low + roll * (high - low + 1)) * 86400)
+        return (now - timedelta(seconds=seconds_ago)).strftime(TIMESTAMP_FORMAT)
 
     def get_product_category_details(self, product_type: str) -> Dict[str, Any]:
         """Get category-specific details"""
-        category_map = {
-            "Shoes": "shoes",
-            "Socks": "socks", 
-            "Apparel": "apparel",
-            "Accessories": "accessories",
-            "Bags": "bags",
-            "Insoles": "insoles",
-            "Laces": "laces",
-            "Care Products": "care products",
-            "Gift Cards": "gift cards",
-            "Underwear": "underwear"
-        }
-        return category_map.get(product_type, "accessories")
+        return CATEGORY_MAP.get(product_type, "accessories")
+
+    def _name_shoes(self, brand: str, material_t: str, color_t: str, gender_t: str, edition_t: str,
+                    product_type: str) -> Tuple[str, str]:
+        """Build a shoe title; returns (title, silhouette)"""
+        choice = self._rand.choice
+        silhouette = choice(self.silhouettes)
+        sole_type_t = choice(self.sole_types_titled)
+        match self._rand.randrange(5):
+            case 0:
+                title = f"{brand} {material_t} {silhouette} - {gender_t} - {color_t}"
+            case 1:
+                title = f"{material_t} {silhouette} - {gender_t}'s - {color_t} ({sole_type_t} Sole)"
+            case 2:
+                title = f"{color_t} {material_t} {silhouette} - {gender_t}'s Edition"
+            case 3:
+                title = f"Eco {material_t} {silhouette}s - {color_t} ({gender_t}'s)"
+            case _:
+                title = f"{material_t} {silhouette} {gender_t}'s - {color_t} {edition_t}"
+        return title, silhouette
+
+    def _name_socks(self, brand: str, material_t: str, color_t: str, gender_t: str, edition_t: str,
+                    product_type: str) -> Tuple[str, str]:
+        """Build a sock title; returns (title, silhouette)"""
+        randrange = self._rand.randrange
+        i = randrange(len(self.sock_types))
+        sock_type, sock_type_t = self.sock_types[i], self.sock_types_titled[i]
+        match randrange(4):
+            case 0:
+                title = f"{material_t} {sock_type_t} Socks - {color_t}"
+            case 1:
+                title = f"{gender_t}'s {material_t} {sock_type_t} - {color_t}"
+            case 2:
+                title = f"Eco {material_t} Socks - {color_t} ({sock_type_t})"
+            case _:
+                title = f"{color_t} {material_t} {sock_type_t} Socks"
+        return title, sock_type
+
+    def _name_apparel(self, brand: str, material_t: str, color_t: str, gender_t: str, edition_t: str,
+                      product_type: str) -> Tuple[str, str]:
+        """Build an apparel title; returns (title, silhouette)"""
+        randrange = self._rand.randrange
+        i = randrange(len(self.apparel_types))
+        apparel_type, apparel_type_t = self.apparel_types[i], self.apparel_types_titled[i]
+        match randrange(4):
+            case 0:
+                title = f"{material_t} {apparel_type_t} - {gender_t}'s - {color_t}"
+            case 1:
+                title = f"{color_t} {material_t} {apparel_type_t} - {gender_t}'s"
+            case 2:
+                title = f"Eco {material_t} {apparel_type_t} - {color_t}"
+            case _:
+                title = f"{gender_t}'s {material_t} {apparel_type_t} in {color_t}"
+        return title, apparel_type
+
+    def _name_generic(self, brand: str, material_t: str, color_t: str, gender_t: str, edition_t: str,
+                      product_type: str) -> Tuple[str, str]:
+        """Generic title for categories without their own templates"""
+        title = f"{brand} {material_t} {product_type.rstrip('s')} - {color_t}"
+        return title, product_type.lower()
 
     def generate_product_name(self, product_type: str) -> Dict[str, str]:
         """Generate product title and handle based on type"""
+        choice = self._rand.choice
+        randrange = self._rand.randrange
         category = self.get_product_category_details(product_type)
-        gender = random.choice(self.genders)
-        material = random.choice(self.materials)
-        color = random.choice(self.colors)
-        edition = random.choice(self.editions)
-        brand = random.choice(self.brands)
-        
-        if category == "shoes":
-            silhouette = random.choice(self.silhouettes)
-            sole_type = random.choice(self.sole_types)
-            template = random.choice(self.product_templates["shoes"])
-            title = template.format(
-                brand=brand, material=material.title(), silhouette=silhouette, 
-                gender=gender.title(), color=color.title(), sole_type=sole_type.title(),
-                edition=edition.title()
-            )
-        elif category == "socks":
-            sock_type = random.choice(self.sock_types)
-            template = random.choice(self.product_templates["socks"])
-            title = template.format(
-                material=material.title(), sock_type=sock_type.title(),
-                color=color.title(), gender=gender.title()
-            )
-            silhouette = sock_type
-        elif category == "apparel":
-            apparel_type = random.choice(self.apparel_types)
-            template = random.choice(self.product_templates["apparel"])
-            title = template.format(
-                material=material.title(), apparel_type=apparel_type.title(),
-                color=color.title(), gender=gender.title()
-            )
-            silhouette = apparel_type
-        else:
-            # Generic template for other categories
-            title = f"{brand} {material.title()} {product_type.rstrip('s')} - {color.title()}"
-            silhouette = product_type.lower()
+        i = randrange(len(self.genders))
+        gender, gender_t = self.genders[i], self.genders_titled[i]
+        i = randrange(len(self.materials))
+        material, material_t = self.materials[i], self.materials_titled[i]
+        i = randrange(len(self.colors))
+        color, color_t = self.colors[i], self.colors_titled[i]
+        edition_t = choice(self.editions_titled)
+        brand = choice(self.brands)
+        
+        builder = self._name_builders.get(category, self._name_generic)
+        title, silhouette = builder(brand, material_t, color_t, gender_t, edition_t, product_type)
         
         # Clean up title
-        title = title.replace("'s's", "'s").replace("  ", " ")
-        handle = title.lower().replace("'s", "").replace(" ", "-").replace("(", "").replace(")", "").replace("--", "-")
+        title = TITLE_FIXUPS.sub("", title)
+        handle = HANDLE_DASHES.sub("-", title.lower().replace("'s", "").translate(HANDLE_TRANS))
         
         return {
             "title": title, 
@@ -180,22 +359,28 @@ class EnhancedManybirdsDataGenerator:
 
     def generate_enhanced_tags(self, product_info: Dict[str, str], price: float, product_type: str) -> List[str]:
         """Generate enhanced Manybirds-style tags"""
-        carbon_score = round(random.uniform(1.8, 5.2), 2)
-        price_tier = random.choice(self.price_tiers)
-        edition = random.choice(self.editions)
+        choice = self._rand.choice
+        random_ = self._rand.random
+        uniform = self._rand.uniform
+        carbon_score = round(uniform(1.8, 5.2), 2)
+        price_tier = choice(self.price_tiers)
+        edition = choice(self.editions)
+        
+        handle = product_info['handle']
+        color = product_info['color']
         
         tags = [
-            f"Manybirds::carbon-score = {carbon_score}",
-            f"Manybirds::cfId = color-{product_info['handle']}-{product_info['color']}-new",
-            f"Manybirds::complete = {random.choice(['true', 'false'])}",
-            f"Manybirds::edition = {edition}",
-            f"Manybirds::gender = {product_info['gender']}",
-            f"Manybirds::hue = {product_info['color']}",
-            f"Manybirds::master = {product_info['handle']}",
-            f"Manybirds::material = {product_info['material']}",
-            f"Manybirds::price-tier = {price_tier}",
-            f"Manybirds::silhouette = {product_info['silhouette']}",
-            f"Manybirds::category = {product_info['category']}",
+            TAG_CARBON_SCORE + str(carbon_score),
+            TAG_CF_ID + handle + "-" + color + "-new",
+            TAG_COMPLETE + choice(('true', 'false')),
+            TAG_EDITION + edition,
+            TAG_GENDER + product_info['gender'],
+            TAG_HUE + color,
+            TAG_MASTER + handle,
+            TAG_MATERIAL + product_info['material'],
+            TAG_PRICE_TIER + price_tier,
+            TAG_SILHOUETTE + product_info['silhouette'],
+            TAG_CATEGORY + product_info['category'],
             "loop::returnable = true"
         ]
         
@@ -209,14 +394,14 @@ class EnhancedManybirdsDataGenerator:
         
         # Add conditional tags
         additional_tags = [
-            "sustainable" if random.choice([True, False]) else None,
+            "sustainable" if choice([True, False]) else None,
             "machine-washable" if product_info['category'] in ['socks', 'apparel'] else None,
             "limited-edition" if edition == "limited" else None,
-            "new-arrival" if random.random() < 0.3 else None,
-            "bestseller" if random.random() < 0.2 else None,
+            "new-arrival" if random_() < 0.3 else None,
+            "bestseller" if random_() < 0.2 else None,
             "eco-friendly" if product_info['material'] in ['recycled', 'organic cotton', 'bamboo'] else None,
             f"made-with-{product_info['material']}" if product_info['material'] != 'cotton' else None,
-            "comfort-fit" if random.choice([True, False]) else None
+            "comfort-fit" if choice([True, False]) else None
         ]
         
         tags.extend([tag for tag in additional_tags if tag])
@@ -227,44 +412,49 @@ class EnhancedManybirdsDataGenerator:
         category = product_info['category']
         gender = product_info['gender']
         
-        # Map category to size type
-        if category in ['shoes', 'insoles']:
-            if gender in ['men', 'women', 'kids', 'toddler', 'baby']:
-                size_category = gender
-            else:  # unisex
-                size_category = random.choice(['men', 'women'])
-        elif category in ['socks', 'apparel', 'underwear']:
-            size_category = category
-        else:
-            size_category = 'accessories'
+        # Map category to size type; unisex footwear is not in the table
+        size_category = self._size_category_for.get((category, gender))
+        if size_category is None:
+            if category in self._footwear_categories:
+                size_category = self._rand.choice(('men', 'women'))
+            else:
+                size_category = 'accessories'
         
-        available_sizes = self.sizes.get(size_category, self.sizes['accessories'])
+        available_sizes = self._size_arrays.get(size_category, self._size_arrays['accessories'])
         
         # Select number of sizes based on category
-        if category == 'shoes':
-            num_sizes = random.randint(6, min(12, len(available_sizes)))
-        elif category in ['apparel', 'socks']:
-            num_sizes = random.randint(4, min(8, len(available_sizes)))
-        else:
-            num_sizes = random.randint(1, min(4, len(available_sizes)))
+        low, high = self._num_sizes_range.get(category, (1, 4))
+        num_sizes = int(self.rng.integers(low, min(high, len(available_sizes)) + 1))
         
-        return random.sample(available_sizes, num_sizes)
+        return self.rng.choice(available_sizes, size=num_sizes, replace=False).tolist()
 
-    def generate_variants(self, product_id: int, product_info: Dict[str, str], base_price: float, product_type: str) -> List[Dict[str, Any]]:
+    def generate_variants(self, product_id: int, product_info: Dict[str, str], base_price: float, product_type: str,
+                          row: Optional[int] = None) -> List[Dict[str, Any]]:
         """Generate product variants with enhanced realism"""
         variants = []
         sizes = self.generate_size_options(product_info, product_type)
         
+        if row is None:
+            row = self._take()
+        draws = self._draws
+        price_variations = draws["price_variation"][row].tolist()
+        compare_rolls = draws["compare_roll"][row].tolist()
+        compare_mults = draws["compare_mult"][row].tolist()
+        availability_rolls = draws["availability"][row].tolist()
+        weight_rolls = draws["weight"][row].tolist()
+        weight_range = WEIGHT_RANGES.get(product_info['category'])
+        
+        # SKU prefix is the same for every variant of the product; the
+        # three-digit suffixes are drawn together
+        sku_prefix = (product_info['brand'][:2] + product_info['category'][:2] + product_info['color'][:2]).upper()
+        sku_suffixes = self.rng.integers(0, 1000, size=len(sizes)).tolist()
+        
         for i, size in enumerate(sizes):
             variant_id = self.generate_id()
             
             # Generate realistic SKU
-            brand_code = product_info['brand'][:2].upper()
-            category_code = product_info['category'][:2].upper()
-            color_code = product_info['color'][:2].upper()
             size_code = size.replace('.', '').replace('-', '')[:3].upper()
-            random_suffix = ''.join(random.choices('0123456789', k=3))
-            sku = f"{brand_code}{category_code}{color_code}{size_code}{random_suffix}"
+            sku = f"{sku_prefix}{size_code}{sku_suffixes[i]:03d}"
             
             # More realistic price variation
             if product_info['category'] == 'shoes':
@@ -273,31 +463,27 @@ class EnhancedManybirdsDataGenerator:
             else:
                 size_factor = 1
                 
-            price_variation = random.uniform(0.98, 1.03) * size_factor
+            price_variation = price_variations[i] * size_factor
             variant_price = round(base_price * price_variation, 2)
             
             # Compare at price (MSRP)
-            if random.choice([True, False]):  # 50% chance of having compare price
-                compare_price = round(variant_price * random.uniform(1.15, 1.67), 2)
+            if compare_rolls[i] < 0.5:  # 50% chance of having compare price
+                compare_price = round(variant_price * compare_mults[i], 2)
             else:
                 compare_price = None
             
             # Weight calculation based on category and size
-            base_weights = {
-                'shoes': random.randint(280, 520),
-                'socks': random.randint(50, 120),
-                'apparel': random.randint(150, 400),
-                'accessories': random.randint(30, 200),
-                'bags': random.randint(200, 800)
-            }
-            
-            base_weight = base_weights.get(product_info['category'], 100)
+            if weight_range:
+                low, high = weight_range
+                base_weight = low + int(weight_rolls[i] * (high - low + 1))
+            else:
+                base_weight = 100
             weight_factor = 1 + (i * 0.08)
             weight = int(base_weight * weight_factor)
             
             # Availability - make some sizes out of stock
             availability_rate = 0.75 if product_info.get('edition') != 'limited' else 0.6
-            available = random.random() < availability_rate
+            available = availability_rolls[i] < availability_rate
             
             variant = {
                 "id": variant_id,
@@ -310,9 +496,9 @@ class EnhancedManybirdsDataGenerator:
                 "taxable": True,
                 "featured_image": None,
                 "available": available,
-                "price": f"{variant_price:.2f}",
+                "price": "%.2f" % variant_price,
                 "grams": weight,
-                "compare_at_price": f"{compare_price:.2f}" if compare_price else None,
+                "compare_at_price": "%.2f" % compare_price if compare_price else None,
                 "position": i + 1,
                 "product_id": product_id,
                 "created_at": self.generate_datetime(60, 800),
@@ -324,37 +510,39 @@ class EnhancedManybirdsDataGenerator:
 
     def generate_images(self, product_id: int, product_info: Dict[str, str]) -> List[Dict[str, Any]]:
         """Generate realistic product images"""
+        choice = self._rand.choice
+        randint = self._rand.randint
         images = []
         
         # Different image counts by category
         if product_info['category'] == 'shoes':
-            num_images = random.randint(4, 8)
+            num_images = randint(4, MAX_IMAGES)
             image_types = ["angle", "side", "top", "detail", "lifestyle", "back", "sole", "worn"]
         elif product_info['category'] in ['apparel', 'bags']:
-            num_images = random.randint(3, 6)
+            num_images = randint(3, 6)
             image_types = ["front", "back", "detail", "lifestyle", "flat", "worn"]
         else:
-            num_images = random.randint(2, 4)
+            num_images = randint(2, 4)
             image_types = ["main", "detail", "lifestyle", "angle"]
         
         for i in range(num_images):
             image_id = self.generate_id()
-            image_type = random.choice(image_types)
+            image_type = choice(image_types)
             
             # Generate realistic filename
             color_code = product_info['color'].replace(' ', '_').lower()
             category_code = product_info['category'].replace(' ', '_').lower()
-            filename = f"{product_info['brand']}_{category_code}_{color_code}_{image_type}_{random.randint(1000, 9999)}.jpg"
+            filename = f"{product_info['brand']}_{category_code}_{color_code}_{image_type}_{randint(1000, 9999)}.jpg"
             
             # CDN URL with realistic structure
             cdn_path = f"products/{product_info['handle']}/{filename}"
-            src = f"https://cdn.shopify.com/s/files/1/1104/4168/{cdn_path}?v={random.randint(1650000000, 1700000000)}"
+            src = f"https://cdn.shopify.com/s/files/1/1104/4168/{cdn_path}?v={randint(1650000000, 1700000000)}"
             
             # Image dimensions based on type
             if image_type in ["lifestyle", "worn"]:
-                dimensions = random.choice([(1920, 1280), (1600, 1200), (2000, 1500)])
+                dimensions = choice([(1920, 1280), (1600, 1200), (2000, 1500)])
             else:
-                dimensions = random.choice([(1600, 1600), (2000, 2000), (1200, 1200)])
+                dimensions = choice([(1600, 1600), (2000, 2000), (1200, 1200)])
             
             image = {
                 "id": image_id,
@@ -402,26 +590,28 @@ class EnhancedManybirdsDataGenerator:
             f"Experience the perfect blend of style and sustainability with our {material} {product_type.lower()} in {color}."
         ])
         
-        return random.choice(category_descriptions)
+        return self._rand.choice(category_descriptions)
 
     def generate_product(self) -> Dict[str, Any]:
         """Generate a complete product with enhanced realism"""
+        row = self._take()
+        draws = self._draws
         product_id = self.generate_id()
-        product_type = random.choice(self.product_types)
+        product_type = self.product_types[draws["type_idx"][row]]
         product_info = self.generate_product_name(product_type)
         
         # Determine pricing
-        category = self.get_product_category_details(product_type)
-        price_range = self.base_prices.get(category, self.base_prices["accessories"])
+        price_range = self._price_range_for_type[product_type]
         
         # Add some premium pricing for certain materials/editions
         price_multiplier = 1.0
         if product_info['material'] in ['cashmere', 'alpaca', 'merino']:
-            price_multiplier *= random.uniform(1.2, 1.5)
+            price_multiplier *= float(draws["material_premium"][row])
         if 'limited' in product_info.get('edition', ''):
-            price_multiplier *= random.uniform(1.1, 1.3)
+            price_multiplier *= float(draws["limited_premium"][row])
             
-        base_price = random.randint(price_range["min"], price_range["max"])
+        price_span = price_range["max"] - price_range["min"] + 1
+        base_price = price_range["min"] + int(draws["base_price"][row] * price_span)
         base_price = int(base_price * price_multiplier)
         
         # Timestamps with realistic distribution
@@ -430,7 +620,16 @@ class EnhancedManybirdsDataGenerator:
         published_at = self.generate_datetime(30, 365)
         
         # Generate variants first to get size options
-        variants = self.generate_variants(product_id, product_info, base_price, product_type)
+        variants = self.generate_variants(product_id, product_info, base_price, product_type, row)
+        
+        images = self.generate_images(product_id, product_info)
+        
+        columns = self._columns
+        columns["product_types"].append(product_type)
+        columns["vendors"].append(product_info["brand"])
+        columns["materials"].append(product_info["material"])
+        columns["variant_counts"].append(len(variants))
+        columns["image_counts"].append(len(images))
         
         product = {
             "id": product_id,
@@ -444,7 +643,7 @@ class EnhancedManybirdsDataGenerator:
             "product_type": product_type,
             "tags": self.generate_enhanced_tags(product_info, base_price, product_type),
             "variants": variants,
-            "images": self.generate_images(product_id, product_info),
+            "images": images,
             "options": [
                 {
                     "id": self.generate_id(),
@@ -458,19 +657,68 @@ class EnhancedManybirdsDataGenerator:
         
         return product
 
-    def generate_dataset(self, num_products: int = 25) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate a complete enhanced dataset"""
+    def _generate_products(self, num_products: int, verbose: bool = True) -> List[Dict[str, Any]]:
+        """Generate products serially in this process"""
         products = []
         
+        self._prefill(num_products)
+        self._columns = self._new_columns()
+        # Progress is redrawn on one line, at most ~50 times per run
+        report_every = max(1, num_products // 50)
+        for i in range(num_products):
+            products.append(self.generate_product())
+            if verbose and ((i + 1) % report_every == 0 or i + 1 == num_products):
+                sys.stdout.write(f"\rGenerated product {i+1}/{num_products}")
+                sys.stdout.flush()
+        if verbose:
+            sys.stdout.write("\n")
+        
+        return products
+
+    def _generate_parallel(self, num_products: int, processes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Generate products in chunks across a pool of worker processes"""
+        processes = processes or os.cpu_count() or 1
+        chunk_size = max(1, -(-num_products // (4 * processes)))
+        
+        # Each chunk gets its own seed and a disjoint block of IDs
+        chunks = []
+        first_id = self._next_id
+        for start in range(0, num_products, chunk_size):
+            count = min(chunk_size, num_products - start)
+            chunks.append((self._rand.randrange(2**32), first_id, count))
+            first_id += count * IDS_PER_PRODUCT
+        self._next_id = first_id
+        
+        products = []
+        self._columns = self._new_columns()
+        with Pool(processes=processes) as pool:
+            for chunk_products, chunk_columns in pool.imap(_generate_chunk, chunks):
+                products.extend(chunk_products)
+                for key, values in chunk_columns.items():
+                    self._columns[key].extend(values)
+                print(f"Generated {len(products)}/{num_products} products")
+        
+        return products
+
+    def generate_dataset(self, num_products: int = 25, processes: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Generate a complete enhanced dataset"""
         print(f"Generating {num_products} enhanced Manybirds-style products...")
         
-        for i in range(num_products):
-            product = self.generate_product()
-            products.append(product)
-            print(f"Generated product {i+1}/{num_products}: {product['title']}")
+        if num_products >= PARALLEL_THRESHOLD:
+            products = self._generate_parallel(num_products, processes)
+        else:
+            products = self._generate_products(num_products)
         
         return {"products": products}
 
+def _generate_chunk(chunk: tuple) -> tuple:
+    """Worker entry point: generate one chunk of products and its summary columns"""
+    seed, first_id, count = chunk
+    generator = EnhancedManybirdsDataGenerator(seed)
+    generator._next_id = first_id
+    products = generator._generate_products(count, verbose=False)
+    return products, generator._columns
+
 def main():
     generator = EnhancedManybirdsDataGenerator()
     
@@ -479,8 +727,12 @@ def main():
     
     # Save to file
     output_file = "enhanced_manybirds_test_data.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(dataset, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(dataset, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(dataset, f, indent=2, ensure_ascii=False)
     
     print(f"\n✅ Generated {len(dataset['products'])} products and saved to {output_file}")
     
@@ -488,31 +740,13 @@ def main():
     print("\n📊 Enhanced Dataset Summary:")
     print(f"Total Products: {len(dataset['products'])}")
     
-    # Category breakdown
-    categories = {}
-    brands = {}
-    materials = {}
-    total_variants = 0
-    total_images = 0
-    
-    for product in dataset['products']:
-        # Count categories
-        category = product['product_type']
-        categories[category] = categories.get(category, 0) + 1
-        
-        # Count brands
-        brand = product['vendor']
-        brands[brand] = brands.get(brand, 0) + 1
-        
-        # Count materials (from tags)
-        for tag in product['tags']:
-            if 'material =' in tag:
-                material = tag.split('= ')[1]
-                materials[material] = materials.get(material, 0) + 1
-                break
-        
-        total_variants += len(product['variants'])
-        total_images += len(product['images'])
+    # Breakdowns come from the columns recorded during generation
+    stats = generator.summarize()
+    categories = stats['categories']
+    brands = stats['brands']
+    materials = stats['materials']
+    total_variants = stats['variants']
+    total_images = stats['images']
     
     print(f"Total Variants: {total_variants}")
     print(f"Total Images: {total_images}")
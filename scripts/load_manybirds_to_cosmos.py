@@ -1,14 +1,126 @@
 import os
+import argparse
 import json
+import asyncio
+import glob
+import hashlib
+import platform
+import random
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from dotenv import load_dotenv
 from gremlin_python.driver import client, serializer
 from gremlin_python.driver.protocol import GremlinServerError
 import sys
 
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional: pip install ijson
+    ijson = None
+
+try:
+    from tqdm import tqdm
+except ImportError:  # optional: pip install tqdm
+    tqdm = None
+
+try:
+    from azure.cosmos import CosmosClient as SyncCosmosClient, PartitionKey, ThroughputProperties
+    from azure.cosmos.aio import CosmosClient
+    from azure.cosmos.exceptions import CosmosHttpResponseError
+except ImportError:  # optional: pip install azure-cosmos
+    CosmosClient = SyncCosmosClient = None
+
+# The async loaders run on uvloop's faster event loop when installed (not available on Windows)
+if platform.system() != 'Windows':
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:  # optional: pip install uvloop
+        pass
+
 # Load environment variables
 load_dotenv()
 
-def get_cosmos_client():
+# All Manybirds vertices share one partition
+PARTITION_KEY = 'products'
+
+# Vertices + edges to accumulate before submitting a batched traversal
+BATCH_OBJECTS = 60
+
+# Batched traversals kept in flight at once (one pooled connection each)
+LOAD_CONCURRENCY = 16
+
+# Product fields that are omitted from the vertex when empty (besides body_html)
+OPTIONAL_PRODUCT_FIELDS = ('product_type', 'published_at', 'created_at', 'updated_at')
+
+# Without tqdm, print a progress line every this many products
+PROGRESS_EVERY = 100
+
+# IDs of products already loaded, so an interrupted load can resume; one file per
+# graph and dataset, named {prefix}.{graph key}.{dataset key}.txt
+CHECKPOINT_PREFIX = '.loaded_ids'
+
+CLEAR_GRAPH_QUERY = "g.V().drop()"
+
+# Container properties carried over by recreate_graph_container, as create_container arguments
+CONTAINER_SETTINGS = {
+    'indexingPolicy': 'indexing_policy',
+    'defaultTtl': 'default_ttl',
+    'analyticalStorageTtl': 'analytical_storage_ttl',
+    'uniqueKeyPolicy': 'unique_key_policy',
+    'conflictResolutionPolicy': 'conflict_resolution_policy',
+    'computedProperties': 'computed_properties',
+    'vectorEmbeddingPolicy': 'vector_embedding_policy',
+    'fullTextPolicy': 'full_text_policy',
+    'changeFeedPolicy': 'change_feed_policy',
+}
+
+# Container properties managed by the service (or copied separately) that need no carrying over
+CONTAINER_SYSTEM_PROPERTIES = frozenset((
+    'id', 'partitionKey', '_rid', '_ts', '_self', '_etag', '_docs', '_sprocs', '_triggers', '_udfs', '_conflicts'
+))
+DEFAULT_GEOSPATIAL_CONFIG = {'type': 'Geography'}
+VERTEX_LABEL_COUNTS_QUERY = "g.V().groupCount().by(label)"
+EDGE_COUNT_QUERY = "g.E().count()"
+
+# Gremlin step templates for batched traversals; {n} is the element's index in
+# the batch and suffixes its binding names. Vertices and edges are upserts
+# (fold/coalesce) so a load can be re-run after a partial failure. fold() drops
+# step labels, so edges refer to their source vertex by id and must directly
+# follow the target vertex. Edges get the same deterministic id (edge_id) as the
+# bulk loader's edge documents, so both loaders upsert the same edges.
+VERTEX_STEP = ".V(id_{{n}}).fold().coalesce(unfold(), addV('{label}').property('partitionKey', pk)"
+PROPERTY_STEP = ".property('{key}', {key}_{{n}})"
+EDGE_STEP = ".coalesce(inE('{label}').hasId({{edge}}), addE('{label}').from(g.V({{source}})).property('id', {{edge}}))"
+HAS_VARIANT_STEP = EDGE_STEP.format(label='has_variant')
+HAS_IMAGE_STEP = EDGE_STEP.format(label='has_image')
+
+# Dataset files at least this big are streamed; smaller ones parse faster in one go
+STREAM_MIN_BYTES = 16 * 1024 * 1024
+
+# Parsed products buffered between the reader and the submitting consumers
+QUEUE_SIZE = 200
+
+# Products parsed per hop to the reader thread
+READ_CHUNK = 50
+
+# Documents per Cosmos DB transactional batch (service limit is 100)
+BULK_BATCH_SIZE = 100
+
+# Retries for throttled (429 RequestRateTooLarge) submits
+MAX_RETRIES = 8
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 10
+
+def get_cosmos_client(pool_size=LOAD_CONCURRENCY):
     """Create and return a Cosmos DB Gremlin client"""
     endpoint = f"wss://{os.getenv('COSMOS_ENDPOINT')}:443/"
     username = os.getenv('COSMOS_USERNAME')
@@ -20,186 +132,624 @@ def get_cosmos_client():
         'g',
         username=username,
         password=password,
+        pool_size=pool_size,
         message_serializer=serializer.GraphSONSerializersV2d0()
     )
 
-def clear_graph(gremlin_client):
-    """Clear all existing data from the graph"""
+def get_documents_endpoint():
+    """The SQL (documents) endpoint of the account that serves COSMOS_ENDPOINT.
+
+    Set COSMOS_DOCUMENTS_ENDPOINT when it isn't the standard
+    https://<account>.documents.azure.com:443/ of the Gremlin host name.
+    """
+    endpoint = os.getenv('COSMOS_DOCUMENTS_ENDPOINT')
+    if endpoint:
+        return endpoint
+    account = os.getenv('COSMOS_ENDPOINT').split('.')[0]
+    return f"https://{account}.documents.azure.com:443/"
+
+def _script_body(script):
+    """A stored procedure, trigger or UDF definition without its system properties"""
+    return {key: value for key, value in script.items() if not key.startswith('_')}
+
+def recreate_graph_container():
+    """Delete and recreate the graph container with the same settings.
+
+    Constant time regardless of graph size, unlike dropping every vertex.
+    The partition key (including hierarchical ones), every container policy in
+    CONTAINER_SETTINGS, dedicated throughput, stored procedures, triggers and
+    UDFs are carried over. Refuses, before deleting anything, when the
+    container has settings it doesn't know how to copy.
+    """
+    cosmos = SyncCosmosClient(get_documents_endpoint(), credential=os.getenv('COSMOS_PASSWORD'))
+    database = cosmos.get_database_client(os.getenv('COSMOS_DATABASE'))
+    graph = os.getenv('COSMOS_GRAPH')
+    container = database.get_container_client(graph)
+    
+    properties = container.read()
+    uncopied = sorted(
+        key for key, value in properties.items()
+        if key not in CONTAINER_SETTINGS and key not in CONTAINER_SYSTEM_PROPERTIES
+        and not (key == 'geospatialConfig' and value == DEFAULT_GEOSPATIAL_CONFIG)
+    )
+    if uncopied:
+        raise ValueError(f"Container {graph} has settings that can't be copied ({', '.join(uncopied)}); "
+                         "clear it with drop() instead")
+    settings = {
+        argument: properties[key]
+        for key, argument in CONTAINER_SETTINGS.items()
+        if properties.get(key) is not None
+    }
+    
+    partition_key = properties['partitionKey']
+    paths = partition_key['paths']
+    settings['partition_key'] = PartitionKey(
+        path=paths if len(paths) > 1 else paths[0],
+        kind=partition_key.get('kind', 'Hash'),
+        version=partition_key.get('version', 2)
+    )
+    
+    try:
+        throughput = container.get_throughput()
+        if throughput.auto_scale_max_throughput:
+            settings['offer_throughput'] = ThroughputProperties(
+                auto_scale_max_throughput=throughput.auto_scale_max_throughput
+            )
+        else:
+            settings['offer_throughput'] = throughput.offer_throughput
+    except CosmosHttpResponseError:
+        # Shared database throughput or serverless - nothing to carry over
+        pass
+    
+    stored_procedures = [_script_body(script) for script in container.scripts.list_stored_procedures()]
+    triggers = [_script_body(script) for script in container.scripts.list_triggers()]
+    functions = [_script_body(script) for script in container.scripts.list_user_defined_functions()]
+    
+    database.delete_container(graph)
+    scripts = database.create_container(id=graph, **settings).scripts
+    for body in stored_procedures:
+        scripts.create_stored_procedure(body=body)
+    for body in triggers:
+        scripts.create_trigger(body=body)
+    for body in functions:
+        scripts.create_user_defined_function(body=body)
+
+def clear_graph(gremlin_client, recreate_container=False):
+    """Clear all existing data from the graph.
+
+    Drops every vertex (and with them every edge) by default. With
+    recreate_container=True the container is deleted and recreated through
+    the SQL API instead, which avoids a drop() traversal that times out on
+    large graphs; that needs azure-cosmos, COSMOS_DATABASE and COSMOS_GRAPH.
+    """
     print("Clearing existing graph data...")
     try:
-        # Drop all vertices (this will also drop all edges)
-        result = gremlin_client.submit("g.V().drop()")
-        result.all().result()
+        if recreate_container:
+            if SyncCosmosClient is None or not (os.getenv('COSMOS_DATABASE') and os.getenv('COSMOS_GRAPH')):
+                raise RuntimeError("Recreating the container requires azure-cosmos, COSMOS_DATABASE and COSMOS_GRAPH")
+            recreate_graph_container()
+        else:
+            # Drop all vertices (this will also drop all edges)
+            submit(gremlin_client, CLEAR_GRAPH_QUERY)
+        # Nothing is loaded any more, so resuming must not skip anything
+        for path in glob.glob(f"{CHECKPOINT_PREFIX}.{graph_key()}.*.txt"):
+            os.remove(path)
         print("Graph cleared successfully")
     except Exception as e:
         print(f"Error clearing graph: {e}")
 
-def load_manybirds_data(gremlin_client, json_file='manybirds_products.json'):
-    """Load Manybirds product data into Cosmos DB"""
+def iter_products(json_file):
+    """Yield products from a dataset file one at a time.
+
+    Large files are streamed with ijson when it is installed so memory stays
+    flat regardless of file size. Smaller files (or all files without ijson)
+    are parsed in one go, with orjson when available.
+    """
+    with open(json_file, 'rb') as f:
+        if ijson is not None and (orjson is None or os.fstat(f.fileno()).st_size >= STREAM_MIN_BYTES):
+            yield from ijson.items(f, 'products.item', use_float=True)
+        elif orjson is not None:
+            yield from orjson.loads(f.read()).get('products', [])
+        else:
+            yield from json.load(f).get('products', [])
+
+# (label, property keys) -> (vertex step template, binding name templates)
+_vertex_templates = {}
+
+# (label, property keys, batch index) -> (rendered vertex step, binding names)
+_vertex_steps = {}
+
+def vertex_template(label, keys):
+    """Return the cached upsert step and binding-name templates for a property layout"""
+    template = _vertex_templates.get((label, keys))
+    if template is None:
+        step = (VERTEX_STEP.format(label=label)
+                + ''.join(PROPERTY_STEP.format(key=key) for key in keys)
+                + ")")
+        template = (step, tuple(f"{key}_{{n}}" for key in keys))
+        _vertex_templates[(label, keys)] = template
+    return template
+
+def vertex_step(label, keys, n):
+    """Return the rendered upsert step and binding names for element n of a batch.
+
+    Batches only ever hold a bounded number of elements and property layouts,
+    so these are rendered once per process and reused by every batch.
+    """
+    rendered = _vertex_steps.get((label, keys, n))
+    if rendered is None:
+        step, names = vertex_template(label, keys)
+        rendered = (step.format(n=n), tuple(name.format(n=n) for name in names))
+        _vertex_steps[(label, keys, n)] = rendered
+    return rendered
+
+class TraversalBatch:
+    """Accumulates vertex/edge upsert steps for several products into one Gremlin traversal"""
+
+    __slots__ = ('steps', 'bindings', 'objects', 'products')
+
+    def __init__(self):
+        self.steps = []
+        self.bindings = {'pk': PARTITION_KEY}
+        self.objects = 0
+        # (product, variant_count, image_count) for each product in the batch
+        self.products = []
+
+    def add_vertex(self, label, properties):
+        """Append a vertex upsert and return the binding name holding its id"""
+        step, names = vertex_step(label, tuple(properties), self.objects)
+        self.steps.append(step)
+        self.bindings.update(zip(names, properties.values()))
+        self.objects += 1
+        # 'id' is always the first property
+        return names[0]
+
+    def add_edge(self, step, label, source_ref, sink_ref):
+        """Append an edge upsert from source_ref to sink_ref, the vertex added just before it"""
+        edge_ref = f"eid_{self.objects}"
+        self.bindings[edge_ref] = edge_id(label, self.bindings[source_ref], self.bindings[sink_ref])
+        self.steps.append(step.format(source=source_ref, edge=edge_ref))
+        self.objects += 1
+
+    def query(self):
+        return 'g' + ''.join(self.steps)
+
+def edge_id(label, source_id, sink_id):
+    """Deterministic edge id shared by the Gremlin and bulk loaders"""
+    return f"{source_id}-{label}-{sink_id}"
+
+def product_elements(product):
+    """Split a product into (product, variants, images) vertex property dicts"""
+    product_id = str(product['id'])
+    properties = {
+        'id': product_id,
+        'title': product['title'],
+        'handle': product['handle'],
+        'vendor': product.get('vendor', 'Manybirds')
+    }
     
-    # Load JSON data
-    print(f"Loading data from {json_file}...")
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    # Optional fields are only stored when set; empty properties still cost RUs
+    body_html = product.get('body_html')
+    if body_html:
+        properties['body_html'] = body_html[:1000] if len(body_html) > 1000 else body_html  # Limit to 1000 chars
+    for key in OPTIONAL_PRODUCT_FIELDS:
+        value = product.get(key)
+        if value:
+            properties[key] = value
+    
+    # Tags are stored as a single comma-separated property
+    tags = product.get('tags')
+    if tags:
+        properties['tags'] = ','.join(tags)
     
-    products = data.get('products', [])
-    print(f"Found {len(products)} products to load")
+    variants = []
+    for variant in product.get('variants', []):
+        if variant.get('id') is None:
+            continue
+        
+        variants.append({
+            'id': str(variant['id']),
+            'title': variant.get('title', ''),
+            'sku': variant.get('sku', ''),
+            'price': float(variant.get('price', 0)),
+            'grams': int(variant.get('grams', 0)),
+            'available': bool(variant.get('available', False)),
+            'position': int(variant.get('position', 0)),
+            'product_id': product_id
+        })
+    
+    images = []
+    for img_idx, image in enumerate(product.get('images', [])):
+        if image.get('id') is None:
+            # Generate ID if missing
+            image_id = f"{product_id}_img_{img_idx}"
+        else:
+            image_id = str(image['id'])
+        
+        images.append({
+            'id': image_id,
+            'src': image.get('src', ''),
+            'width': int(image.get('width', 0)),
+            'height': int(image.get('height', 0)),
+            'position': int(image.get('position', img_idx)),
+            'product_id': product_id
+        })
     
-    # Create vertices for products
-    for idx, product in enumerate(products):
+    return properties, variants, images
+
+def add_product(batch, product):
+    """Append a product vertex plus its variants and images (with edges) to a batch"""
+    properties, variants, images = product_elements(product)
+    
+    product_ref = batch.add_vertex('product', properties)
+    for variant in variants:
+        variant_ref = batch.add_vertex('variant', variant)
+        batch.add_edge(HAS_VARIANT_STEP, 'has_variant', product_ref, variant_ref)
+    for image in images:
+        image_ref = batch.add_vertex('image', image)
+        batch.add_edge(HAS_IMAGE_STEP, 'has_image', product_ref, image_ref)
+    
+    batch.products.append((product, len(variants), len(images)))
+
+def status_attributes(error):
+    """Cosmos DB status attributes of a Gremlin error; empty when the server sent none"""
+    return error.status_attributes or {}
+
+def is_throttled(error):
+    """Whether a Gremlin error is Cosmos DB rate limiting (429 RequestRateTooLarge)"""
+    if not isinstance(error, GremlinServerError):
+        return False
+    return error.status_code == 429 or status_attributes(error).get('x-ms-status-code') == 429
+
+def parse_retry_after(retry_after):
+    """Seconds in an x-ms-retry-after-ms value, or None if it can't be parsed"""
+    try:
+        return float(retry_after) / 1000
+    except (TypeError, ValueError):
+        pass
+    try:
+        # The Gremlin endpoint reports it as a TimeSpan, e.g. "00:00:00.0150000"
+        hours, minutes, seconds = str(retry_after).split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+def retry_delay(error, attempt):
+    """Seconds to wait before retrying a throttled request.
+
+    Honors the x-ms-retry-after-ms hint Cosmos DB sends with a 429, falling
+    back to capped exponential backoff with jitter (also when the hint can't
+    be parsed) so throttled requests don't retry in lockstep.
+    """
+    retry_after = status_attributes(error).get('x-ms-retry-after-ms')
+    delay = parse_retry_after(retry_after) if retry_after is not None else None
+    if delay is None:
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt * (0.5 + random.random()))
+    return delay
+
+def submit(gremlin_client, query, bindings=None):
+    """Submit a query and wait for all results, retrying when throttled"""
+    for attempt in range(MAX_RETRIES + 1):
         try:
-            # Create product vertex - using 'partitionKey' property name
-            query = """
-            g.addV('product')
-                .property('id', productId)
-                .property('partitionKey', pk)
-                .property('title', title)
-                .property('handle', handle)
-                .property('body_html', body_html)
-                .property('vendor', vendor)
-                .property('product_type', product_type)
-                .property('published_at', published_at)
-                .property('created_at', created_at)
-                .property('updated_at', updated_at)
-            """
-            
-            bindings = {
-                'productId': str(product['id']),
-                'pk': 'products',  # Use a fixed partition key for all products
-                'title': product['title'],
-                'handle': product['handle'],
-                'body_html': product.get('body_html', '')[:1000],  # Limit to 1000 chars
-                'vendor': product.get('vendor', 'Manybirds'),
-                'product_type': product.get('product_type', ''),
-                'published_at': product.get('published_at', ''),
-                'created_at': product.get('created_at', ''),
-                'updated_at': product.get('updated_at', '')
-            }
-            
-            result = gremlin_client.submit(query, bindings)
-            result.all().result()
-            
-            # Add tags as a single property (comma-separated)
-            tags = product.get('tags', [])
-            if tags:
-                tags_str = ','.join(tags)
-                tag_query = "g.V(productId).property('tags', tags)"
-                gremlin_client.submit(tag_query, {'productId': str(product['id']), 'tags': tags_str}).all().result()
-            
-            # Create variant vertices and edges
-            variant_count = 0
-            for variant in product.get('variants', []):
-                if variant.get('id') is None:
-                    continue
-                    
-                variant_query = """
-                g.addV('variant')
-                    .property('id', variantId)
-                    .property('partitionKey', pk)
-                    .property('title', title)
-                    .property('sku', sku)
-                    .property('price', price)
-                    .property('grams', grams)
-                    .property('available', available)
-                    .property('position', position)
-                    .property('product_id', productId)
-                """
-                
-                variant_bindings = {
-                    'variantId': str(variant['id']),
-                    'pk': 'products',  # Same partition key as parent product
-                    'title': variant.get('title', ''),
-                    'sku': variant.get('sku', ''),
-                    'price': float(variant.get('price', 0)),
-                    'grams': int(variant.get('grams', 0)),
-                    'available': bool(variant.get('available', False)),
-                    'position': int(variant.get('position', 0)),
-                    'productId': str(product['id'])
-                }
-                
-                gremlin_client.submit(variant_query, variant_bindings).all().result()
-                
-                # Create edge from product to variant
-                edge_query = "g.V(productId).addE('has_variant').to(g.V(variantId))"
-                edge_bindings = {
-                    'productId': str(product['id']),
-                    'variantId': str(variant['id'])
-                }
-                gremlin_client.submit(edge_query, edge_bindings).all().result()
-                variant_count += 1
-            
-            # Create image vertices and edges  
-            image_count = 0
-            for img_idx, image in enumerate(product.get('images', [])):
-                if image.get('id') is None:
-                    # Generate ID if missing
-                    image_id = f"{product['id']}_img_{img_idx}"
-                else:
-                    image_id = str(image['id'])
-                    
-                image_query = """
-                g.addV('image')
-                    .property('id', imageId)
-                    .property('partitionKey', pk)
-                    .property('src', src)
-                    .property('width', width)
-                    .property('height', height)
-                    .property('position', position)
-                    .property('product_id', productId)
-                """
-                
-                image_bindings = {
-                    'imageId': image_id,
-                    'pk': 'products',  # Same partition key as parent product
-                    'src': image.get('src', ''),
-                    'width': int(image.get('width', 0)),
-                    'height': int(image.get('height', 0)),
-                    'position': int(image.get('position', img_idx)),
-                    'productId': str(product['id'])
-                }
-                
-                gremlin_client.submit(image_query, image_bindings).all().result()
-                
-                # Create edge from product to image
-                edge_query = "g.V(productId).addE('has_image').to(g.V(imageId))"
-                edge_bindings = {
-                    'productId': str(product['id']),
-                    'imageId': image_id
-                }
-                gremlin_client.submit(edge_query, edge_bindings).all().result()
-                image_count += 1
-            
-            print(f"Loaded product {idx + 1}/{len(products)}: {product['title']} (with {variant_count} variants and {image_count} images)")
-            
+            return gremlin_client.submit(query, bindings).all().result()
+        except GremlinServerError as e:
+            if attempt == MAX_RETRIES or not is_throttled(e):
+                raise
+            time.sleep(retry_delay(e, attempt))
+
+async def submit_async(gremlin_client, query, bindings=None, executor=None):
+    """Submit a query without blocking the event loop, retrying when throttled.
+
+    gremlinpython's transport drives its own event loop, so the blocking
+    submit runs on a worker thread of executor rather than on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    
+    def execute_query():
+        return gremlin_client.submit(query, bindings).all().result()
+    
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await loop.run_in_executor(executor, execute_query)
+        except GremlinServerError as e:
+            if attempt == MAX_RETRIES or not is_throttled(e):
+                raise
+            await asyncio.sleep(retry_delay(e, attempt))
+
+async def load_products_async(gremlin_client, products, on_result, concurrency=LOAD_CONCURRENCY):
+    """Load products in batched traversals of roughly BATCH_OBJECTS vertices and edges.
+
+    A reader parses products in a worker thread and feeds a bounded queue that
+    `concurrency` consumers drain, each building and submitting its own batches,
+    so parsing overlaps with traversal building and network round trips. A
+    product is never split across batches. on_result(product, variant_count,
+    image_count, error) is called for every product once its batch completes;
+    error is None on success. Returns the number of products loaded.
+    """
+    loaded = 0
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    loop = asyncio.get_running_loop()
+    # One thread per consumer for the blocking submits, separate from the reader's default executor
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='gremlin')
+    
+    async def produce():
+        iterator = iter(products)
+        while chunk := await loop.run_in_executor(None, list, islice(iterator, READ_CHUNK)):
+            for product in chunk:
+                await queue.put(product)
+        # One end marker per consumer
+        for _ in range(concurrency):
+            await queue.put(None)
+    
+    async def flush(batch):
+        nonlocal loaded
+        try:
+            await submit_async(gremlin_client, batch.query(), batch.bindings, executor)
+            error = None
         except Exception as e:
-            print(f"Error loading product {product.get('title', 'Unknown')}: {e}")
-            import traceback
-            traceback.print_exc()
+            error = e
+        
+        if error is not None and len(batch.products) > 1:
+            # Retry each product as its own fused traversal so one bad product
+            # doesn't fail the rest of its batch
+            for product, _, _ in batch.products:
+                single = TraversalBatch()
+                add_product(single, product)
+                await flush(single)
+            return
+        
+        for product, variant_count, image_count in batch.products:
+            if error is None:
+                loaded += 1
+            on_result(product, variant_count, image_count, error)
     
-    print("\nData loading completed!")
+    async def consume():
+        batch = TraversalBatch()
+        while (product := await queue.get()) is not None:
+            try:
+                add_product(batch, product)
+            except Exception as e:
+                # Malformed product - report it and keep going
+                on_result(product, 0, 0, e)
+                continue
+            if batch.objects >= BATCH_OBJECTS:
+                await flush(batch)
+                batch = TraversalBatch()
+        if batch.products:
+            await flush(batch)
+    
+    try:
+        await asyncio.gather(produce(), *(consume() for _ in range(concurrency)))
+    finally:
+        executor.shutdown(wait=False)
+    return loaded
+
+def load_products(gremlin_client, products, on_result, concurrency=LOAD_CONCURRENCY):
+    """Synchronous wrapper around load_products_async"""
+    return asyncio.run(load_products_async(gremlin_client, products, on_result, concurrency))
+
+def vertex_document(label, properties):
+    """Build a vertex in the document format the Gremlin API stores"""
+    document = {'id': properties['id'], 'label': label, 'partitionKey': PARTITION_KEY}
+    for key, value in properties.items():
+        if key != 'id':
+            document[key] = [{'id': str(uuid.uuid4()), '_value': value}]
+    return document
+
+def edge_document(label, source_id, source_label, sink_id, sink_label):
+    """Build an edge in the document format the Gremlin API stores.
+
+    Edges live in the source vertex's partition; the id is derived from the
+    endpoints so re-running an import upserts instead of duplicating edges.
+    """
+    return {
+        'id': edge_id(label, source_id, sink_id),
+        'label': label,
+        'partitionKey': PARTITION_KEY,
+        '_isEdge': True,
+        '_vertexId': source_id,
+        '_vertexLabel': source_label,
+        '_sink': sink_id,
+        '_sinkLabel': sink_label,
+        '_sinkPartition': PARTITION_KEY
+    }
+
+def product_documents(product):
+    """Build the vertex and edge documents for a product, its variants and images"""
+    properties, variants, images = product_elements(product)
+    product_id = properties['id']
+    
+    documents = [vertex_document('product', properties)]
+    for variant in variants:
+        documents.append(vertex_document('variant', variant))
+        documents.append(edge_document('has_variant', product_id, 'product', variant['id'], 'variant'))
+    for image in images:
+        documents.append(vertex_document('image', image))
+        documents.append(edge_document('has_image', product_id, 'product', image['id'], 'image'))
+    
+    return documents, len(variants), len(images)
+
+async def bulk_load_products_async(products, on_result, concurrency=LOAD_CONCURRENCY):
+    """Bulk-import products through the SQL API, bypassing the Gremlin query engine.
+
+    Vertices and edges are upserted as graph documents in transactional batches
+    of up to BULK_BATCH_SIZE operations; a product is never split across
+    batches. Reports through on_result like load_products_async.
+    """
+    if CosmosClient is None:
+        raise ImportError("Bulk loading requires azure-cosmos (pip install azure-cosmos)")
+    
+    loaded = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+    
+    async with CosmosClient(get_documents_endpoint(), credential=os.getenv('COSMOS_PASSWORD')) as cosmos:
+        container = cosmos.get_database_client(os.getenv('COSMOS_DATABASE')).get_container_client(os.getenv('COSMOS_GRAPH'))
+        
+        async def flush(operations, batch_products):
+            nonlocal loaded
+            try:
+                await container.execute_item_batch(operations, partition_key=PARTITION_KEY)
+                error = None
+            except Exception as e:
+                error = e
+            finally:
+                semaphore.release()
+            for product, variant_count, image_count in batch_products:
+                if error is None:
+                    loaded += 1
+                on_result(product, variant_count, image_count, error)
+        
+        async def dispatch(operations, batch_products):
+            await semaphore.acquire()
+            task = asyncio.create_task(flush(operations, batch_products))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        # Products are parsed in a worker thread, READ_CHUNK at a time, so a
+        # streaming reader never blocks the event loop
+        loop = asyncio.get_running_loop()
+        iterator = iter(products)
+        operations, batch_products = [], []
+        while chunk := await loop.run_in_executor(None, list, islice(iterator, READ_CHUNK)):
+            for product in chunk:
+                try:
+                    documents, variant_count, image_count = product_documents(product)
+                except Exception as e:
+                    on_result(product, 0, 0, e)
+                    continue
+                if operations and len(operations) + len(documents) > BULK_BATCH_SIZE:
+                    await dispatch(operations, batch_products)
+                    operations, batch_products = [], []
+                operations.extend(('upsert', (document,)) for document in documents)
+                batch_products.append((product, variant_count, image_count))
+        if operations:
+            await dispatch(operations, batch_products)
+        
+        await asyncio.gather(*pending)
+    
+    return loaded
+
+def bulk_load_products(products, on_result, concurrency=LOAD_CONCURRENCY):
+    """Synchronous wrapper around bulk_load_products_async"""
+    return asyncio.run(bulk_load_products_async(products, on_result, concurrency))
+
+def graph_key():
+    """Short stable key for the graph COSMOS_ENDPOINT, COSMOS_DATABASE and COSMOS_GRAPH point at"""
+    graph = f"{os.getenv('COSMOS_ENDPOINT')}/{os.getenv('COSMOS_DATABASE')}/{os.getenv('COSMOS_GRAPH')}"
+    return hashlib.blake2b(graph.encode(), digest_size=4).hexdigest()
+
+def checkpoint_path(json_file):
+    """Checkpoint file for loading json_file into the configured graph"""
+    dataset = os.path.abspath(json_file)
+    name = os.path.splitext(os.path.basename(dataset))[0]
+    digest = hashlib.blake2b(dataset.encode(), digest_size=4).hexdigest()
+    return f"{CHECKPOINT_PREFIX}.{graph_key()}.{name}-{digest}.txt"
+
+class Checkpoint:
+    """Product IDs already loaded into the graph, persisted one per line.
+
+    With resume=True the IDs recorded by an earlier run are skipped; otherwise
+    the file is started over and every product is loaded.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.skipped = 0
+        self.ids = set()
+        if resume and os.path.exists(path):
+            with open(path, 'r') as f:
+                self.ids = set(f.read().splitlines())
+        self._file = open(path, 'a' if resume else 'w')
+
+    def pending(self, products):
+        """Yield only the products that are not in the checkpoint yet"""
+        for product in products:
+            if str(product['id']) in self.ids:
+                self.skipped += 1
+                continue
+            yield product
+
+    def record(self, product):
+        product_id = str(product['id'])
+        self.ids.add(product_id)
+        self._file.write(f"{product_id}\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class LoadProgress:
+    """on_result callback that reports loading progress on a single line.
+
+    Uses a tqdm bar when tqdm is installed, otherwise prints a status line every
+    PROGRESS_EVERY products. Errors are always printed; successfully loaded
+    products are recorded in the checkpoint, if one is given.
+    """
+
+    def __init__(self, success_prefix='', error_prefix='', checkpoint=None):
+        self.count = 0
+        self.success_prefix = success_prefix
+        self.error_prefix = error_prefix
+        self.checkpoint = checkpoint
+        self.bar = tqdm(desc='Loading', unit='product') if tqdm is not None else None
+
+    def __call__(self, product, variant_count, image_count, error):
+        self.count += 1
+        if error is None:
+            if self.checkpoint is not None:
+                self.checkpoint.record(product)
+        else:
+            message = f"{self.error_prefix}Error loading product {product.get('title', 'Unknown')}: {error}"
+            if self.bar is not None:
+                self.bar.write(message)
+            else:
+                print(message)
+        if self.bar is not None:
+            self.bar.update()
+        elif self.count % PROGRESS_EVERY == 0:
+            print(f"{self.success_prefix}Processed {self.count} products...")
+
+    def close(self):
+        if self.bar is not None:
+            self.bar.close()
+
+def load_manybirds_data(gremlin_client, json_file='manybirds_products.json', resume=False, use_checkpoint=True):
+    """Load Manybirds product data into Cosmos DB.
+
+    Loaded product IDs are recorded in a checkpoint for this dataset and graph
+    unless use_checkpoint is False; resume=True skips those of an earlier run.
+    """
+    
+    print(f"Loading data from {json_file}...")
+    
+    products = iter_products(json_file)
+    checkpoint = Checkpoint(checkpoint_path(json_file), resume) if use_checkpoint else None
+    if checkpoint is not None:
+        products = checkpoint.pending(products)
+    progress = LoadProgress(checkpoint=checkpoint)
+    try:
+        loaded = load_products(gremlin_client, products, progress)
+    finally:
+        progress.close()
+        if checkpoint is not None:
+            checkpoint.close()
+    
+    if checkpoint is not None and checkpoint.skipped:
+        print(f"Skipped {checkpoint.skipped} products already loaded (see {checkpoint.path})")
+    print(f"\nData loading completed! Loaded {loaded}/{progress.count} products")
 
 def verify_data(gremlin_client):
     """Verify the loaded data"""
     try:
-        # Count products
-        product_count_query = "g.V().hasLabel('product').count()"
-        result = gremlin_client.submit(product_count_query)
-        product_count = result.all().result()[0]
-        
-        # Count variants
-        variant_count_query = "g.V().hasLabel('variant').count()"
-        result = gremlin_client.submit(variant_count_query)
-        variant_count = result.all().result()[0]
-        
-        # Count images
-        image_count_query = "g.V().hasLabel('image').count()"
-        result = gremlin_client.submit(image_count_query)
-        image_count = result.all().result()[0]
+        # Count vertices per label in a single scan
+        label_counts = submit(gremlin_client, VERTEX_LABEL_COUNTS_QUERY)[0]
+        product_count = label_counts.get('product', 0)
+        variant_count = label_counts.get('variant', 0)
+        image_count = label_counts.get('image', 0)
         
         # Count edges
-        edge_count_query = "g.E().count()"
-        result = gremlin_client.submit(edge_count_query)
-        edge_count = result.all().result()[0]
+        edge_count = submit(gremlin_client, EDGE_COUNT_QUERY)[0]
         
         print(f"\nVerification Results:")
         print(f"- Products loaded: {product_count}")
@@ -210,8 +760,7 @@ def verify_data(gremlin_client):
         # Sample query to show a product with its relationships
         if product_count > 0:
             sample_query = "g.V().hasLabel('product').limit(1).values('title')"
-            result = gremlin_client.submit(sample_query)
-            sample_title = result.all().result()[0]
+            sample_title = submit(gremlin_client, sample_query)[0]
             print(f"\nSample product loaded: {sample_title}")
         
     except Exception as e:
@@ -219,6 +768,13 @@ def verify_data(gremlin_client):
 
 def main():
     """Main function to load Manybirds data into Cosmos DB"""
+    parser = argparse.ArgumentParser(description='Load the Manybirds product catalog into Cosmos DB')
+    parser.add_argument('--resume', action='store_true', help='Skip products recorded as loaded by an earlier run')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Do not record loaded products for --resume')
+    parser.add_argument('--recreate-container', action='store_true',
+                        help='Clear by deleting and recreating the container instead of drop() (requires azure-cosmos)')
+    args = parser.parse_args()
+    
     try:
         # Create Cosmos DB client
         gremlin_client = get_cosmos_client()
@@ -226,17 +782,16 @@ def main():
         # Optional: Clear existing data
         response = input("Do you want to clear existing data before loading? (y/n): ")
         if response.lower() == 'y':
-            clear_graph(gremlin_client)
+            clear_graph(gremlin_client, recreate_container=args.recreate_container)
         
         # Load the data
-        load_manybirds_data(gremlin_client)
+        load_manybirds_data(gremlin_client, resume=args.resume, use_checkpoint=not args.no_checkpoint)
         
         # Verify the data was loaded
         verify_data(gremlin_client)
         
     except Exception as e:
         print(f"Error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
     finally:
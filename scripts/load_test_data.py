@@ -8,17 +8,23 @@ into Azure Cosmos DB using the Gremlin API.
 Usage examples:
     python load_test_data.py --file manybirds_sample_small.json
     python load_test_data.py --file combined_manybirds_dataset.json --clear
+    python load_test_data.py --file combined_manybirds_dataset.json --bulk
+    python load_test_data.py --file combined_manybirds_dataset.json --resume
     python load_test_data.py --list  # Show available datasets
 """
 
 import argparse
 import os
-import json
 import sys
-from typing import Dict, List, Any
+import traceback
+from collections import Counter
+from typing import Dict, Iterable, List, Any, Optional
 
 # Import the existing loader functions
-from load_manybirds_to_cosmos import get_cosmos_client, clear_graph, verify_data
+from load_manybirds_to_cosmos import (
+    get_cosmos_client, clear_graph, verify_data, load_products, bulk_load_products, iter_products,
+    Checkpoint, LoadProgress, checkpoint_path
+)
 
 
 def list_available_datasets() -> List[str]:
@@ -47,27 +53,25 @@ def list_available_datasets() -> List[str]:
 def get_dataset_info(file_path: str) -> Dict[str, Any]:
     """Get information about a dataset file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        products = data.get('products', [])
-        total_variants = sum(len(p.get('variants', [])) for p in products)
-        total_images = sum(len(p.get('images', [])) for p in products)
+        product_count = 0
+        total_variants = 0
+        total_images = 0
         
         # Get product types
-        product_types = {}
-        vendors = {}
+        product_types = Counter()
+        vendors = Counter()
         
-        for product in products:
-            ptype = product.get('product_type', 'Unknown')
-            vendor = product.get('vendor', 'Unknown')
-            
-            product_types[ptype] = product_types.get(ptype, 0) + 1
-            vendors[vendor] = vendors.get(vendor, 0) + 1
+        # Single streaming pass over the products
+        for product in iter_products(file_path):
+            product_count += 1
+            total_variants += len(product.get('variants') or ())
+            total_images += len(product.get('images') or ())
+            product_types[product.get('product_type', 'Unknown')] += 1
+            vendors[product.get('vendor', 'Unknown')] += 1
         
         return {
             'file_size': os.path.getsize(file_path),
-            'products': len(products),
+            'products': product_count,
             'variants': total_variants,
             'images': total_images,
             'product_types': product_types,
@@ -78,170 +82,64 @@ def get_dataset_info(file_path: str) -> Dict[str, Any]:
         return {'error': str(e)}
 
 
-def load_dataset_to_cosmos(gremlin_client, file_path: str) -> bool:
-    """Load a specific dataset file to Cosmos DB"""
+def load_dataset_to_cosmos(gremlin_client, file_path: str, bulk: bool = False,
+                           resume: bool = False, use_checkpoint: bool = True) -> bool:
+    """Load a specific dataset file to Cosmos DB.
+
+    Loaded product IDs are recorded in a checkpoint for this dataset and graph
+    unless use_checkpoint is False; resume=True skips those of an earlier run.
+    """
     
     print(f"📂 Loading dataset from: {file_path}")
     
     try:
-        # Load JSON data
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        products = data.get('products', [])
-        print(f"📊 Found {len(products)} products to load")
-        
-        if not products:
-            print("⚠️  No products found in dataset")
-            return False
-        
-        # Load products using the same logic as the original loader
-        return load_products_to_cosmos(gremlin_client, products)
+        checkpoint = Checkpoint(checkpoint_path(file_path), resume) if use_checkpoint else None
+        # Products are streamed from the file and loaded as they are parsed
+        return load_products_to_cosmos(gremlin_client, iter_products(file_path), bulk, checkpoint)
         
     except Exception as e:
         print(f"❌ Error loading dataset: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
 
-def load_products_to_cosmos(gremlin_client, products: List[Dict[str, Any]]) -> bool:
-    """Load products into Cosmos DB (adapted from original loader)"""
+def load_products_to_cosmos(gremlin_client, products: Iterable[Dict[str, Any]], bulk: bool = False,
+                            checkpoint: Optional[Checkpoint] = None) -> bool:
+    """Load products into Cosmos DB in batched traversals (shared with the original loader).
+
+    With bulk=True the graph documents are written through the SQL API instead.
+    Loaded products are recorded in the checkpoint, if one is given, and
+    products it already holds are skipped. The checkpoint is closed afterwards.
+    """
     
-    successful_loads = 0
+    if checkpoint is not None:
+        products = checkpoint.pending(products)
+    progress = LoadProgress(success_prefix='✅ ', error_prefix='❌ ', checkpoint=checkpoint)
+    try:
+        if bulk:
+            successful_loads = bulk_load_products(products, progress)
+        else:
+            successful_loads = load_products(gremlin_client, products, progress)
+    finally:
+        progress.close()
+        if checkpoint is not None:
+            checkpoint.close()
     
-    for idx, product in enumerate(products):
-        try:
-            # Create product vertex
-            query = """
-            g.addV('product')
-                .property('id', productId)
-                .property('partitionKey', pk)
-                .property('title', title)
-                .property('handle', handle)
-                .property('body_html', body_html)
-                .property('vendor', vendor)
-                .property('product_type', product_type)
-                .property('published_at', published_at)
-                .property('created_at', created_at)
-                .property('updated_at', updated_at)
-            """
-            
-            bindings = {
-                'productId': str(product['id']),
-                'pk': 'products',
-                'title': product['title'],
-                'handle': product['handle'],
-                'body_html': product.get('body_html', '')[:1000],
-                'vendor': product.get('vendor', 'Manybirds'),
-                'product_type': product.get('product_type', ''),
-                'published_at': product.get('published_at', ''),
-                'created_at': product.get('created_at', ''),
-                'updated_at': product.get('updated_at', '')
-            }
-            
-            result = gremlin_client.submit(query, bindings)
-            result.all().result()
-            
-            # Add tags
-            tags = product.get('tags', [])
-            if tags:
-                tags_str = ','.join(tags)
-                tag_query = "g.V(productId).property('tags', tags)"
-                gremlin_client.submit(tag_query, {'productId': str(product['id']), 'tags': tags_str}).all().result()
-            
-            # Load variants
-            variant_count = 0
-            for variant in product.get('variants', []):
-                if variant.get('id') is None:
-                    continue
-                    
-                variant_query = """
-                g.addV('variant')
-                    .property('id', variantId)
-                    .property('partitionKey', pk)
-                    .property('title', title)
-                    .property('sku', sku)
-                    .property('price', price)
-                    .property('grams', grams)
-                    .property('available', available)
-                    .property('position', position)
-                    .property('product_id', productId)
-                """
-                
-                variant_bindings = {
-                    'variantId': str(variant['id']),
-                    'pk': 'products',
-                    'title': variant.get('title', ''),
-                    'sku': variant.get('sku', ''),
-                    'price': float(variant.get('price', 0)),
-                    'grams': int(variant.get('grams', 0)),
-                    'available': bool(variant.get('available', False)),
-                    'position': int(variant.get('position', 0)),
-                    'productId': str(product['id'])
-                }
-                
-                gremlin_client.submit(variant_query, variant_bindings).all().result()
-                
-                # Create edge from product to variant
-                edge_query = "g.V(productId).addE('has_variant').to(g.V(variantId))"
-                edge_bindings = {
-                    'productId': str(product['id']),
-                    'variantId': str(variant['id'])
-                }
-                gremlin_client.submit(edge_query, edge_bindings).all().result()
-                variant_count += 1
-            
-            # Load images
-            image_count = 0
-            for img_idx, image in enumerate(product.get('images', [])):
-                if image.get('id') is None:
-                    image_id = f"{product['id']}_img_{img_idx}"
-                else:
-                    image_id = str(image['id'])
-                    
-                image_query = """
-                g.addV('image')
-                    .property('id', imageId)
-                    .property('partitionKey', pk)
-                    .property('src', src)
-                    .property('width', width)
-                    .property('height', height)
-                    .property('position', position)
-                    .property('product_id', productId)
-                """
-                
-                image_bindings = {
-                    'imageId': image_id,
-                    'pk': 'products',
-                    'src': image.get('src', ''),
-                    'width': int(image.get('width', 0)),
-                    'height': int(image.get('height', 0)),
-                    'position': int(image.get('position', img_idx)),
-                    'productId': str(product['id'])
-                }
-                
-                gremlin_client.submit(image_query, image_bindings).all().result()
-                
-                # Create edge from product to image
-                edge_query = "g.V(productId).addE('has_image').to(g.V(imageId))"
-                edge_bindings = {
-                    'productId': str(product['id']),
-                    'imageId': image_id
-                }
-                gremlin_client.submit(edge_query, edge_bindings).all().result()
-                image_count += 1
-            
-            successful_loads += 1
-            print(f"✅ Loaded product {idx + 1}/{len(products)}: {product['title']} (with {variant_count} variants and {image_count} images)")
-            
-        except Exception as e:
-            print(f"❌ Error loading product {product.get('title', 'Unknown')}: {e}")
+    skipped = checkpoint.skipped if checkpoint is not None else 0
+    if skipped:
+        print(f"⏭️  Skipped {skipped} products already loaded (see {checkpoint.path})")
+    
+    count = progress.count
+    if count == 0:
+        if skipped:
+            return True
+        print("⚠️  No products found in dataset")
+        return False
     
     print(f"\n📊 Loading Summary:")
-    print(f"  Products attempted: {len(products)}")
+    print(f"  Products attempted: {count}")
     print(f"  Products loaded successfully: {successful_loads}")
-    print(f"  Success rate: {(successful_loads/len(products)*100):.1f}%")
+    print(f"  Success rate: {(successful_loads/count*100):.1f}%")
     
     return successful_loads > 0
 
@@ -253,6 +151,11 @@ def main():
     parser.add_argument('--info', '-i', help='Show information about a dataset file')
     parser.add_argument('--clear', '-c', action='store_true', help='Clear existing data before loading')
     parser.add_argument('--verify', '-v', action='store_true', help='Verify data after loading')
+    parser.add_argument('--bulk', '-b', action='store_true', help='Bulk import through the SQL API (requires azure-cosmos)')
+    parser.add_argument('--resume', '-r', action='store_true', help='Skip products this dataset already loaded into the graph')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Do not record loaded products for --resume')
+    parser.add_argument('--recreate-container', action='store_true',
+                        help='With --clear, delete and recreate the container instead of drop() (requires azure-cosmos)')
     
     args = parser.parse_args()
     
@@ -303,12 +206,10 @@ def main():
         print(f"📊 Avg images per product: {info['images']/info['products']:.1f}")
         
         print(f"\n📋 Product Types:")
-        for ptype, count in sorted(info['product_types'].items()):
-            print(f"  {ptype}: {count}")
+        print("\n".join(f"  {ptype}: {count}" for ptype, count in sorted(info['product_types'].items())))
         
         print(f"\n🏷️ Vendors:")
-        for vendor, count in sorted(info['vendors'].items()):
-            print(f"  {vendor}: {count}")
+        print("\n".join(f"  {vendor}: {count}" for vendor, count in sorted(info['vendors'].items())))
         
         return
     
@@ -331,13 +232,14 @@ def main():
             if args.clear:
                 response = input("⚠️  Are you sure you want to clear existing data? (y/n): ")
                 if response.lower() == 'y':
-                    clear_graph(gremlin_client)
+                    clear_graph(gremlin_client, recreate_container=args.recreate_container)
                 else:
                     print("❌ Operation cancelled")
                     return
             
             # Load the dataset
-            success = load_dataset_to_cosmos(gremlin_client, args.file)
+            success = load_dataset_to_cosmos(gremlin_client, args.file, args.bulk,
+                                             resume=args.resume, use_checkpoint=not args.no_checkpoint)
             
             if success:
                 print("✅ Dataset loaded successfully!")
@@ -352,7 +254,6 @@ def main():
                 
         except Exception as e:
             print(f"❌ Error: {e}")
-            import traceback
             traceback.print_exc()
             sys.exit(1)
         finally:
@@ -8,16 +8,31 @@ temporal tracking, and hybrid search while adapting to Cosmos DB's capabilities.
 
 import os
 import json
+import logging
 import asyncio
+import base64
+import copy
+import functools
+import hashlib
 import platform
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Union
-from dataclasses import dataclass
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
-# Fix for Windows ProactorEventLoop issues
+# Fix for Windows ProactorEventLoop issues; elsewhere use uvloop's faster event loop when installed
 if platform.system() == 'Windows':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+else:
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:  # optional: pip install uvloop
+        pass
 
 import numpy as np
 from openai import AsyncAzureOpenAI
@@ -25,9 +40,266 @@ from gremlin_python.driver import client, serializer
 from gremlin_python.driver.protocol import GremlinServerError
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Episode content is split into ~2k-token chunks (at ~4 characters each) for extraction
+EXTRACTION_CHUNK_CHARS = 8000
+EXTRACTION_CHUNK_OVERLAP = 200
+
+# Azure OpenAI embeddings limits (tokens estimated at ~4 characters each)
+EMBEDDING_MAX_INPUTS = 2048
+EMBEDDING_MAX_INPUT_TOKENS = 8191
+EMBEDDING_MAX_REQUEST_TOKENS = 300_000
+
+# Embeddings remembered by text hash (~12 KB each at 3072 float32 dimensions)
+EMBEDDING_CACHE_SIZE = 10_000
+
+# Parsed LLM extractions remembered by chunk text hash, so re-ingested content skips the LLM call
+EXTRACTION_CACHE_SIZE = 1024
+
+# Edges chained into one Gremlin submit (~10 steps each, staying near 100 steps)
+EDGE_BATCH_SIZE = 10
+
+# Flat entity projection; avoids valueMap(true) wrapping every property in a list
+ENTITY_PROJECTION = (
+    ".project('id', 'name', 'entity_type', 'description')"
+    ".by(id)"
+    ".by('name')"
+    ".by(coalesce(values('entity_type'), constant('')))"
+    ".by(coalesce(values('description'), constant('')))"
+)
+
+# Neighbor rows fetched per range() page by iter_entity_neighbors
+NEIGHBOR_PAGE_SIZE = 10
+
+# Pages of `limit` entities scanned by the local search fallback
+SEARCH_MAX_PAGES = 10
+
+# Minimum cosine similarity for an entity to be returned on embedding similarity alone
+SEMANTIC_MIN_SCORE = 0.5
+
+# Gremlin scripts are built once here and parameterized through bindings
+# Reads open with has('partitionKey', groupName): group vertices use their group name as the
+# container's partition key, so Cosmos DB serves them from one partition instead of fanning out
+EPISODE_UPSERT_QUERY = """
+g.V(episodeId).hasLabel('episode').fold().coalesce(
+    unfold()
+        .property('content', content)
+        .property('source', source)
+        .property('timestamp', timestamp)
+        .property('last_updated', now)
+        .constant('updated'),
+    addV('episode')
+        .property('id', episodeId)
+        .property('partitionKey', pk)
+        .property('content', content)
+        .property('source', source)
+        .property('timestamp', timestamp)
+        .property('created_at', now)
+        .property('group_name', groupName)
+        .constant('created')
+)
+"""
+
+ENTITY_UPDATE_QUERY = """
+g.V(entityId)
+    .property('description', description)
+    .property('last_updated', timestamp)
+    .property('last_episode', episodeId)
+"""
+
+ENTITY_UPSERT_QUERY = """
+g.V(entityId).hasLabel('entity').fold().coalesce(
+    unfold()
+        .property('description', description)
+        .property('last_updated', timestamp)
+        .property('last_episode', episodeId),
+    addV('entity')
+        .property('id', entityId)
+        .property('partitionKey', pk)
+        .property('name', name)
+        .property('entity_type', entityType)
+        .property('description', description)
+        .property('created_at', timestamp)
+        .property('group_name', groupName)
+        .property('first_episode', episodeId)
+)
+"""
+
+ENTITY_EXACT_MATCH_QUERY = """
+g.V().has('partitionKey', groupName)
+    .has('group_name', groupName)
+    .hasLabel('entity')
+    .has('name', searchTerm)
+    .limit(limitCount)
+""" + ENTITY_PROJECTION
+
+ENTITY_PAGE_QUERY = """
+g.V().has('partitionKey', groupName)
+    .has('group_name', groupName)
+    .hasLabel('entity')
+    .range(pageStart, pageEnd)
+""" + ENTITY_PROJECTION
+
+RELATIONSHIP_EDGES_QUERY = """
+g.V().has('partitionKey', groupName)
+    .outE()
+    .has('group_name', groupName)
+    .limit(limitCount)
+    .project('edge_props', 'edge_label', 'source_name', 'target_name')
+    .by(valueMap(true))
+    .by(label())
+    .by(outV().values('name').fold())
+    .by(inV().values('name').fold())
+"""
+
+NEIGHBORS_PAGE_QUERY = """
+g.V(entityId).has('partitionKey', groupName)
+    .bothE()
+    .as('e')
+    .bothV()
+    .as('v')
+    .select('e', 'v')
+    .by(project('id', 'label').by(id).by(label))
+    .by(project('id', 'name').by(id).by(coalesce(values('name'), constant(''))))
+    .range(pageStart, pageEnd)
+"""
+
+NEIGHBORS_BATCH_QUERY = """
+g.V().has('partitionKey', groupName)
+    .has('group_name', groupName)
+    .hasLabel('entity')
+    .has('name', within(entityNames))
+    .as('src')
+    .bothE()
+    .as('e')
+    .otherV()
+    .as('v')
+    .select('src', 'e', 'v')
+    .by('name')
+    .by(project('id', 'label').by(id).by(label))
+    .by(project('id', 'name').by(id).by(coalesce(values('name'), constant(''))))
+    .limit(limitCount)
+"""
+
+GRAPH_STATS_QUERY = """
+g.V().has('partitionKey', groupName).has('group_name', groupName).fold()
+    .project('episodes', 'entities', 'relationships')
+    .by(unfold().hasLabel('episode').count())
+    .by(unfold().hasLabel('entity').count())
+    .by(unfold().outE().has('group_name', groupName).count())
+"""
+
+# Spaces and the characters Cosmos DB rejects in ids (/ \ ? #) become underscores
+_SLUG_TABLE = str.maketrans(dict.fromkeys(' /\\?#', '_'))
+
+# Separator between source and target in relationship search result names
+_ARROW = ' → '
+
+# Entity ids remembered as already written this session (LRU-bounded)
+ENTITY_CACHE_SIZE = 50_000
+
+# Read results (searches, stats, neighbors) cached per arguments, and for how long in
+# seconds by default (GRAPHITI_READ_CACHE_TTL); writes from other clients show up after this
+READ_CACHE_SIZE = 1024
+READ_CACHE_TTL = 60
+
+# Seconds between pings that keep idle Gremlin WebSockets from being dropped
+KEEPALIVE_INTERVAL = 30
+
+# Delay before the first retry of a throttled Gremlin request, in seconds
+RETRY_BASE_DELAY = 0.1
+
+# Episodes the demo ingests at once (each runs its own LLM extraction and Gremlin writes)
+EPISODE_CONCURRENCY = 4
+
+
+def _is_rate_limited(error: GremlinServerError) -> bool:
+    """Check whether a Gremlin error is Cosmos DB throttling (429 RequestRateTooLarge)"""
+    attributes = error.status_attributes or {}
+    return (error.status_code == 429
+            or attributes.get('x-ms-status-code') == 429
+            or 'Request rate is large' in (error.status_message or ''))
+
+
+def _is_conflict(error: GremlinServerError) -> bool:
+    """Check whether a Gremlin error is Cosmos DB rejecting a duplicate vertex id (409 Conflict)"""
+    attributes = error.status_attributes or {}
+    return error.status_code == 409 or attributes.get('x-ms-status-code') == 409
+
+
+def _slug(name: str) -> str:
+    """Lowercase name with spaces and characters Cosmos DB forbids in ids replaced by underscores"""
+    return name.translate(_SLUG_TABLE).lower()
+
+
+def _empty_neighborhood(entity_name: str) -> Dict[str, Any]:
+    """Neighborhood with no neighbors, with fresh lists like a populated one"""
+    return {'center_entity': entity_name, 'entities': [], 'relationships': []}
+
+
+def _flatten_valuemap(element: Dict[str, Any]) -> Dict[str, Any]:
+    """Unwrap valueMap-style single-element property lists in one pass over an element map"""
+    return {
+        key: (value[0] if value else '') if isinstance(value, list) else value
+        for key, value in element.items()
+    }
+
+
+def _cached_read(method):
+    """Serve repeated calls with the same arguments from the instance's TTL read cache"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        # Lists (e.g. batches of names) become tuples so the arguments can key the cache
+        frozen_args = tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
+        key = (method.__name__, self.group_name, self._graph_version, frozen_args, tuple(sorted(kwargs.items())))
+        return await self._cached(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
+
+class _OrjsonGraphSONSerializer(serializer.GraphSONSerializersV2d0):
+    """GraphSON v2 serializer that parses Gremlin responses with orjson"""
+    
+    def deserialize_message(self, message):
+        return self._graphson_reader.to_object(orjson.loads(message))
+
+
+def _parse_json(text: str) -> Any:
+    """Parse a JSON document from the LLM, with orjson when available"""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _parse_retry_after(retry_after: Any) -> Optional[float]:
+    """Seconds in an x-ms-retry-after-ms value, or None if it can't be parsed"""
+    try:
+        return float(retry_after) / 1000
+    except (TypeError, ValueError):
+        pass
+    try:
+        # Cosmos DB reports it as a TimeSpan, e.g. "00:00:00.0150000"
+        hours, minutes, seconds = str(retry_after).split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+def _retry_delay(error: GremlinServerError, attempt: int) -> float:
+    """Seconds to wait before retrying a throttled request"""
+    retry_after = (error.status_attributes or {}).get('x-ms-retry-after-ms')
+    delay = _parse_retry_after(retry_after) if retry_after is not None else None
+    if delay is None:
+        # No usable hint from the server - back off exponentially with jitter
+        delay = RETRY_BASE_DELAY * (2 ** attempt + random.random())
+    return delay
+
 
 class EntityType(Enum):
     """Supported entity types for knowledge graph"""
@@ -49,6 +321,11 @@ class RelationType(Enum):
     HAPPENED_AT = "happened_at"
 
 
+# Value -> member lookups for parsing LLM output without Enum.__call__
+_ENTITY_BY_VALUE = {entity_type.value: entity_type for entity_type in EntityType}
+_RELATION_BY_VALUE = {relation_type.value: relation_type for relation_type in RelationType}
+
+
 @dataclass
 class Episode:
     """Represents a data episode for ingestion"""
@@ -72,11 +349,13 @@ class Entity:
     entity_type: EntityType
     description: Optional[str] = None
     properties: Optional[Dict[str, Any]] = None
-    embedding: Optional[List[float]] = None
+    embedding: Optional[np.ndarray] = None  # float32
+    id: str = field(init=False, default='')
     
     def __post_init__(self):
         if self.properties is None:
             self.properties = {}
+        self.id = f"entity_{_slug(self.name)}"
 
 
 @dataclass
@@ -119,6 +398,17 @@ class GraphitiCosmosConfig:
         # Graphiti Configuration
         self.group_name = os.getenv('GRAPHITI_GROUP_NAME', 'default_graph')
         
+        # Gremlin request handling: retries for throttled requests and
+        # the maximum number of queries in flight at once
+        self.max_retries = int(os.getenv('GRAPHITI_MAX_RETRIES', '5'))
+        self.max_concurrency = int(os.getenv('GRAPHITI_MAX_CONCURRENCY', '8'))
+        
+        # Gremlin connection pool size (WebSocket connections to Cosmos DB)
+        self.pool_size = int(os.getenv('GRAPHITI_POOL_SIZE', '8'))
+        
+        # Seconds a cached read result is served before the graph is queried again (0 disables caching)
+        self.read_cache_ttl = float(os.getenv('GRAPHITI_READ_CACHE_TTL', str(READ_CACHE_TTL)))
+        
         # Validate configuration
         self._validate_config()
     
@@ -147,38 +437,107 @@ class GraphitiCosmos:
     mapping, and hybrid search capabilities.
     """
     
-    def __init__(self, config: Optional[GraphitiCosmosConfig] = None):
+    def __init__(self, config: Optional[GraphitiCosmosConfig] = None, pool_size: Optional[int] = None):
         self.config = config or GraphitiCosmosConfig()
+        if pool_size is not None:
+            # Connections in the Gremlin client's own pool (gremlinpython pools per Client)
+            self.config.pool_size = pool_size
         self.gremlin_client = None
         self.openai_client = None
         self.group_name = self.config.group_name
+        self._gremlin_semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        self._gremlin_executor = self._create_gremlin_executor()
+        # Entity ids known to exist in the graph, most recently used last
+        self._entity_cache: OrderedDict[str, None] = OrderedDict()
+        # Unit-normalized entity embeddings, one contiguous float32 row per id in _emb_ids.
+        # Rows past len(_emb_ids) are spare capacity.
+        self._emb_matrix = np.empty((0, 0), dtype=np.float32)
+        self._emb_ids: List[str] = []
+        self._emb_rows: Dict[str, int] = {}
+        # Embeddings by blake2b digest of the embedded text, most recently used last
+        self._embedding_cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        # Parsed extraction JSON by blake2b digest of the chunk text, most recently used last
+        self._extraction_cache: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+        # Read results by call, as (expiry, result); bumping _graph_version invalidates them all
+        self._read_cache: OrderedDict[tuple, Tuple[float, Any]] = OrderedDict()
+        self._graph_version = 0
+        self._keepalive_task: Optional[asyncio.Task] = None
+        # addE query strings by (binding suffix, property keys); identical scripts let the server reuse its parse
+        self._edge_query_cache: Dict[Tuple[str, frozenset], str] = {}
         
     async def initialize(self):
-        """Initialize the Graphiti-Cosmos system"""
+        """Initialize the Graphiti-Cosmos system.
+
+        The Gremlin client is meant to live for the whole process: create one
+        GraphitiCosmos, initialize it once and close it at shutdown. Calling
+        initialize() again reuses the existing connections.
+        """
+        if self.gremlin_client is not None:
+            return
+        if self._gremlin_executor is None:
+            # Closed before; start over with fresh threads
+            self._gremlin_executor = self._create_gremlin_executor()
         await self._initialize_cosmos_client()
         await self._initialize_openai_client()
         await self._setup_graph_schema()
+        self._keepalive_task = asyncio.create_task(self._keepalive())
+    
+    def _create_gremlin_executor(self) -> ThreadPoolExecutor:
+        """Dedicated threads for blocking Gremlin calls, separate from the default executor.
+
+        One per request the semaphore admits, so an admitted request never waits for a thread.
+        """
+        return ThreadPoolExecutor(
+            max_workers=max(self.config.pool_size, self.config.max_concurrency), thread_name_prefix='gremlin'
+        )
+    
+    async def __aenter__(self) -> 'GraphitiCosmos':
+        await self.initialize()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _keepalive(self):
+        """Ping Cosmos DB periodically so idle pooled WebSockets stay open.
+
+        Pings go straight to the executor rather than through _execute_gremlin_query,
+        so they take no semaphore slot, are never retried, and a failed ping is only
+        logged at debug level.
+        """
+        loop = asyncio.get_running_loop()
+        
+        def ping():
+            return self.gremlin_client.submit("g.inject(0)").all().result()
+        
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
+            try:
+                await loop.run_in_executor(self._gremlin_executor, ping)
+            except Exception as e:
+                logger.debug("Keepalive ping failed: %s", e)
         
     async def _initialize_cosmos_client(self):
         """Initialize Cosmos DB Gremlin client"""
         try:
             # Create client with proper async handling
-            import threading
-            
             def create_client():
                 return client.Client(
                     self.config.cosmos_endpoint,
                     'g',
                     username=self.config.cosmos_username,
                     password=self.config.cosmos_password,
-                    message_serializer=serializer.GraphSONSerializersV2d0()
+                    pool_size=self.config.pool_size,
+                    max_workers=self.config.pool_size * 2,
+                    message_serializer=(_OrjsonGraphSONSerializer() if orjson is not None
+                                        else serializer.GraphSONSerializersV2d0())
                 )
             
             # Run client creation in a thread to avoid event loop conflicts
-            loop = asyncio.get_event_loop()
-            self.gremlin_client = await loop.run_in_executor(None, create_client)
+            loop = asyncio.get_running_loop()
+            self.gremlin_client = await loop.run_in_executor(self._gremlin_executor, create_client)
             
-            print("✅ Connected to Azure Cosmos DB")
+            logger.info("Connected to Azure Cosmos DB")
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Cosmos DB: {e}")
     
@@ -190,319 +549,429 @@ class GraphitiCosmos:
                 api_version=self.config.azure_openai_api_version,
                 azure_endpoint=self.config.azure_openai_endpoint
             )
-            print("✅ Connected to Azure OpenAI")
+            logger.info("Connected to Azure OpenAI")
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Azure OpenAI: {e}")
     
     async def _execute_gremlin_query(self, query: str, bindings: Dict[str, Any] = None):
-        """Execute Gremlin query safely in async context"""
+        """Execute Gremlin query safely in async context, retrying when throttled"""
+        if self.gremlin_client is None:
+            raise RuntimeError("GraphitiCosmos is not connected; call initialize() first")
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             
             def execute_query():
                 result = self.gremlin_client.submit(query, bindings or {})
                 return result.all().result()
             
-            return await loop.run_in_executor(None, execute_query)
+            for attempt in range(self.config.max_retries + 1):
+                async with self._gremlin_semaphore:
+                    try:
+                        return await loop.run_in_executor(self._gremlin_executor, execute_query)
+                    except GremlinServerError as e:
+                        if attempt == self.config.max_retries or not _is_rate_limited(e):
+                            raise
+                        delay = _retry_delay(e, attempt)
+                # Back off without holding a slot, so other queries keep running meanwhile
+                await asyncio.sleep(delay)
         except Exception as e:
-            print(f"❌ Error executing Gremlin query: {e}")
+            logger.error("Error executing Gremlin query: %s", e)
             raise
     
     async def _setup_graph_schema(self):
         """Setup basic graph schema for knowledge graph"""
         try:
             # Create episode vertex label
-            print("🔧 Setting up graph schema...")
+            logger.info("Setting up graph schema...")
             
             # Note: Cosmos DB Gremlin doesn't require explicit schema creation
             # but we can create some initial structure
             
-            print("✅ Graph schema setup complete")
+            logger.info("Graph schema setup complete")
         except Exception as e:
-            print(f"⚠️  Warning: Schema setup failed: {e}")
+            logger.warning("Schema setup failed: %s", e)
     
     async def add_episode(self, episode: Episode) -> str:
         """Add an episode to the knowledge graph"""
         try:
-            print(f"📝 Processing episode: {episode.episode_id}")
+            logger.debug("Processing episode: %s", episode.episode_id)
+            # One timestamp for every vertex and edge written for this episode
+            now_iso = datetime.now(timezone.utc).isoformat()
             
             # Extract entities and relationships from the episode
-            entities = await self._extract_entities(episode.content)
-            relationships = await self._extract_relationships(episode.content, entities)
+            entities, relationships = await self._extract_graph(episode.content)
             
             # Create episode vertex
-            episode_vertex_id = await self._create_episode_vertex(episode)
-            
-            # Create or update entities
+            episode_vertex_id = await self._create_episode_vertex(episode, now_iso)
+            
+            # Create or update entities concurrently (bounded by the Gremlin semaphore).
+            # Entities sharing an id are written once so the writes can't race.
+            unique_entities = list({entity.id: entity for entity in entities}.values())
+            results = await asyncio.gather(
+                *(self._create_or_update_entity(entity, episode.episode_id, now_iso) for entity in unique_entities),
+                return_exceptions=True
+            )
             entity_ids = []
-            for entity in entities:
-                entity_id = await self._create_or_update_entity(entity, episode.episode_id)
-                entity_ids.append(entity_id)
-                
-                # Connect episode to entity
-                await self._create_relationship_edge(
-                    episode_vertex_id, entity_id, "mentions", 
-                    {"confidence": 0.8, "episode_id": episode.episode_id}
-                )
-            
-            # Create relationships between entities
+            for entity, result in zip(unique_entities, results):
+                if isinstance(result, Exception):
+                    logger.warning("Could not create entity %s: %s", entity.name, result)
+                else:
+                    entity_ids.append(result)
+            
+            # Connect episode to entities and entities to each other. Edges between
+            # vertices written above are chained into a few batched submits.
+            edges = [
+                (episode_vertex_id, entity_id, "mentions", {"confidence": 0.8, "episode_id": episode.episode_id})
+                for entity_id in entity_ids
+            ]
+            known_ids = set(entity_ids)
+            other_relationships = []
             for relationship in relationships:
-                await self._create_relationship_from_entities(relationship, episode.episode_id)
+                edge = self._relationship_edge(relationship, episode.episode_id)
+                if edge[0] in known_ids and edge[1] in known_ids:
+                    edges.append(edge)
+                else:
+                    # Endpoint from an earlier episode (or none at all) - submit on its own
+                    other_relationships.append(edge)
+            
+            await asyncio.gather(
+                self._create_relationship_edges(edges, now_iso),
+                *(self._create_relationship_edge(*edge, now_iso=now_iso) for edge in other_relationships)
+            )
             
-            print(f"✅ Episode {episode.episode_id} processed successfully")
-            print(f"   - Entities: {len(entities)}")
-            print(f"   - Relationships: {len(relationships)}")
+            logger.info("Episode %s processed: %d entities, %d relationships",
+                        episode.episode_id, len(entities), len(relationships))
             
             return episode_vertex_id
             
         except Exception as e:
-            print(f"❌ Error processing episode {episode.episode_id}: {e}")
+            logger.error("Error processing episode %s: %s", episode.episode_id, e)
             raise
+        finally:
+            # Cached reads may no longer reflect the graph
+            self._graph_version += 1
     
-    async def _extract_entities(self, content: str) -> List[Entity]:
-        """Extract entities from text using Azure OpenAI"""
+    async def _extract_graph(self, content: str) -> Tuple[List[Entity], List[Relationship]]:
+        """Extract entities and the relationships between them, one concurrent LLM call per content chunk"""
+        # Nothing for the LLM to extract from blank content, so skip the completion request
+        if not content or not content.strip():
+            return [], []
+        
         try:
-            prompt = f"""
-            Extract entities from the following text. For each entity, determine:
-            1. Name (exact text from content)
-            2. Type (person, organization, product, concept, event, location)
-            3. Brief description
+            chunks = self._chunk_text(content)
+            results = await asyncio.gather(
+                *(self._extract_graph_chunk(chunk) for chunk in chunks),
+                return_exceptions=True
+            )
+            
+            # Merge chunks, keeping the first occurrence of each entity and relationship
+            entities_by_key = {}
+            raw_relationships = []
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning("Could not extract from content chunk: %s", result)
+                    continue
+                chunk_entities, chunk_relationships = result
+                for entity in chunk_entities:
+                    entities_by_key.setdefault((entity.name.lower(), entity.entity_type), entity)
+                raw_relationships.extend(chunk_relationships)
+            entities = list(entities_by_key.values())
+            
+            # Relationships may only connect entities extracted from this content
+            entity_ids = {entity.id for entity in entities}
+            relationships_by_key = {}
+            for relationship in raw_relationships if len(entities) >= 2 else []:
+                source_id = self._entity_id(relationship.source_entity)
+                target_id = self._entity_id(relationship.target_entity)
+                if source_id not in entity_ids or target_id not in entity_ids:
+                    logger.debug("Skipping relationship with unknown entity: %s -> %s",
+                                 relationship.source_entity, relationship.target_entity)
+                    continue
+                relationships_by_key.setdefault((source_id, target_id, relationship.relation_type), relationship)
+            relationships = list(relationships_by_key.values())
+            
+            # Embed all entities in as few requests as possible
+            embeddings = await self._generate_embeddings(
+                [f"{entity.name} {entity.description}" for entity in entities]
+            )
+            for entity, embedding in zip(entities, embeddings):
+                entity.embedding = embedding
             
-            Text: {content}
+            return entities, relationships
             
-            Return a JSON array of entities in this format:
-            [
+        except Exception:
+            logger.exception("Error extracting entities and relationships")
+            return [], []
+    
+    async def _extract_graph_chunk(self, content: str) -> Tuple[List[Entity], List[Relationship]]:
+        """Extract entities and relationships from one chunk of content in a single Azure OpenAI call"""
+        prompt = f"""
+        Extract entities from the following text, then identify relationships between them.
+        
+        For each entity, determine:
+        1. Name (exact text from content)
+        2. Type (person, organization, product, concept, event, location)
+        3. Brief description
+        
+        For each relationship, determine:
+        1. Source entity (must be one of the extracted entity names)
+        2. Target entity (must be one of the extracted entity names)
+        3. Relationship type (related_to, works_for, located_in, created_by, belongs_to, happened_at)
+        4. Description of the relationship
+        5. Confidence (0.0 to 1.0)
+        
+        Text: {content}
+        
+        Return a JSON object in this format:
+        {{
+            "entities": [
                 {{
                     "name": "entity name",
                     "type": "entity_type",
                     "description": "brief description"
                 }}
-            ]
-            
-            Only return valid JSON, no other text.
-            """
-            
-            response = await self.openai_client.chat.completions.create(
-                model=self.config.llm_deployment,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=1000
-            )
-            
-            entities_data = json.loads(response.choices[0].message.content)
-            entities = []
-            
-            for entity_data in entities_data:
-                try:
-                    entity_type = EntityType(entity_data['type'].lower())
-                    entity = Entity(
-                        name=entity_data['name'],
-                        entity_type=entity_type,
-                        description=entity_data.get('description', '')
-                    )
-                    
-                    # Generate embedding for the entity
-                    entity.embedding = await self._generate_embedding(
-                        f"{entity.name} {entity.description}"
-                    )
-                    
-                    entities.append(entity)
-                except (ValueError, KeyError) as e:
-                    print(f"⚠️  Skipping invalid entity: {entity_data} - {e}")
-            
-            return entities
-            
-        except Exception as e:
-            print(f"❌ Error extracting entities: {e}")
-            return []
-    
-    async def _extract_relationships(self, content: str, entities: List[Entity]) -> List[Relationship]:
-        """Extract relationships between entities"""
-        if len(entities) < 2:
-            return []
-        
-        try:
-            entity_names = [entity.name for entity in entities]
-            
-            prompt = f"""
-            Given the following text and entities, identify relationships between entities.
-            
-            Text: {content}
-            Entities: {entity_names}
-            
-            For each relationship, determine:
-            1. Source entity (must be from the entity list)
-            2. Target entity (must be from the entity list)
-            3. Relationship type (related_to, works_for, located_in, created_by, belongs_to, happened_at)
-            4. Description of the relationship
-            5. Confidence (0.0 to 1.0)
-            
-            Return a JSON array:
-            [
+            ],
+            "relationships": [
                 {{
                     "source": "source entity name",
-                    "target": "target entity name", 
+                    "target": "target entity name",
                     "type": "relationship_type",
                     "description": "relationship description",
                     "confidence": 0.8
                 }}
             ]
-            
-            Only return valid JSON, no other text.
-            """
-            
+        }}
+        
+        Only return valid JSON, no other text.
+        """
+        
+        key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+        graph_data = self._extraction_cache.get(key)
+        if graph_data is not None:
+            self._extraction_cache.move_to_end(key)
+        else:
             response = await self.openai_client.chat.completions.create(
                 model=self.config.llm_deployment,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=1000
+                max_tokens=2000,
+                response_format={"type": "json_object"}
             )
             
-            relationships_data = json.loads(response.choices[0].message.content)
-            relationships = []
-            
-            for rel_data in relationships_data:
-                try:
-                    relation_type = RelationType(rel_data['type'].lower())
-                    relationship = Relationship(
-                        source_entity=rel_data['source'],
-                        target_entity=rel_data['target'],
-                        relation_type=relation_type,
-                        description=rel_data.get('description', ''),
-                        confidence=float(rel_data.get('confidence', 0.5))
-                    )
-                    relationships.append(relationship)
-                except (ValueError, KeyError) as e:
-                    print(f"⚠️  Skipping invalid relationship: {rel_data} - {e}")
-            
-            return relationships
-            
-        except Exception as e:
-            print(f"❌ Error extracting relationships: {e}")
-            return []
+            graph_data = _parse_json(response.choices[0].message.content)
+            self._extraction_cache[key] = graph_data
+            while len(self._extraction_cache) > EXTRACTION_CACHE_SIZE:
+                self._extraction_cache.popitem(last=False)
+        
+        entities = []
+        
+        for entity_data in graph_data.get('entities', []):
+            entity_type = _ENTITY_BY_VALUE.get(str(entity_data.get('type', '')).lower())
+            if entity_type is None or not entity_data.get('name'):
+                logger.debug("Skipping invalid entity: %s", entity_data)
+                continue
+            entities.append(Entity(
+                name=entity_data['name'],
+                entity_type=entity_type,
+                description=entity_data.get('description', '')
+            ))
+        
+        relationships = []
+        for rel_data in graph_data.get('relationships', []):
+            relation_type = _RELATION_BY_VALUE.get(str(rel_data.get('type', '')).lower())
+            source, target = rel_data.get('source'), rel_data.get('target')
+            if relation_type is None or not source or not target:
+                logger.debug("Skipping invalid relationship: %s", rel_data)
+                continue
+            
+            try:
+                confidence = float(rel_data.get('confidence', 0.5))
+            except (TypeError, ValueError):
+                confidence = 0.5
+            relationships.append(Relationship(
+                source_entity=source,
+                target_entity=target,
+                relation_type=relation_type,
+                description=rel_data.get('description', ''),
+                confidence=confidence
+            ))
+        
+        return entities, relationships
     
-    async def _generate_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def _chunk_text(content: str, max_chars: int = EXTRACTION_CHUNK_CHARS,
+                    overlap: int = EXTRACTION_CHUNK_OVERLAP) -> List[str]:
+        """Split text into chunks of at most max_chars, overlapping so boundary entities aren't cut off"""
+        if len(content) <= max_chars:
+            return [content]
+        
+        chunks = []
+        start = 0
+        while True:
+            end = start + max_chars
+            if end >= len(content):
+                chunks.append(content[start:])
+                return chunks
+            # Break on whitespace when there is some past the overlap
+            split = max(content.rfind(' ', start + overlap + 1, end), content.rfind('\n', start + overlap + 1, end))
+            if split > 0:
+                end = split
+            chunks.append(content[start:end])
+            start = end - overlap
+    
+    async def _generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for text using Azure OpenAI"""
-        try:
-            response = await self.openai_client.embeddings.create(
-                model=self.config.embeddings_deployment,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"❌ Error generating embedding: {e}")
-            return []
-    async def _create_episode_vertex(self, episode: Episode) -> str:
-        """Create or update episode vertex in Cosmos DB"""
+        return (await self._generate_embeddings([text]))[0]
+    
+    async def _generate_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """Generate float32 embeddings for several texts with batched Azure OpenAI requests.
+
+        Blank texts get an empty array without a request, and texts embedded
+        before (by hash, within the LRU bound) reuse the cached vector.
+        """
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        max_chars = EMBEDDING_MAX_INPUT_TOKENS * 4
+        
+        # Texts still to embed, by hash, with the positions that need each one
+        pending: Dict[bytes, Tuple[str, List[int]]] = {}
+        for i, text in enumerate(texts):
+            text = text[:max_chars]
+            if not text.strip():
+                embeddings[i] = np.empty(0, dtype=np.float32)
+                continue
+            key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                embeddings[i] = cached
+            else:
+                pending.setdefault(key, (text, []))[1].append(i)
+        
+        # Split into requests within the input count and total token limits
+        batches = []
+        batch, batch_tokens = [], 0
+        for key, (text, _) in pending.items():
+            tokens = len(text) // 4 + 1
+            if batch and (len(batch) == EMBEDDING_MAX_INPUTS or batch_tokens + tokens > EMBEDDING_MAX_REQUEST_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(key)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        
+        for batch in batches:
+            try:
+                response = await self.openai_client.embeddings.create(
+                    model=self.config.embeddings_deployment,
+                    input=[pending[key][0] for key in batch]
+                )
+                vectors = [
+                    np.asarray(item.embedding, dtype=np.float32)
+                    for item in sorted(response.data, key=lambda item: item.index)
+                ]
+            except Exception:
+                logger.exception("Error generating embeddings")
+                vectors = [np.empty(0, dtype=np.float32) for _ in batch]
+            else:
+                for key, vector in zip(batch, vectors):
+                    self._embedding_cache[key] = vector
+                while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+            
+            for key, vector in zip(batch, vectors):
+                for i in pending[key][1]:
+                    embeddings[i] = vector
+        
+        return embeddings
+    
+    async def _create_episode_vertex(self, episode: Episode, now_iso: Optional[str] = None) -> str:
+        """Create or update episode vertex in Cosmos DB with a single upsert traversal"""
         episode_id = f"episode_{episode.episode_id}"
+        now = now_iso or datetime.now(timezone.utc).isoformat()
         
-        # Check if episode exists
-        check_query = "g.V(episodeId).hasLabel('episode')"
-        existing = await self._execute_gremlin_query(check_query, {'episodeId': episode_id})
-        
-        if existing:
-            # Update existing episode
-            print(f"📝 Episode {episode.episode_id} already exists, updating...")
-            query = """
-            g.V(episodeId)
-                .property('content', content)
-                .property('source', source)
-                .property('timestamp', timestamp)
-                .property('last_updated', lastUpdated)
-            """
-            
-            bindings = {
-                'episodeId': episode_id,
-                'content': episode.content[:2000],  # Limit content length
-                'source': episode.source,
-                'timestamp': episode.timestamp.isoformat(),
-                'lastUpdated': datetime.now(timezone.utc).isoformat()
-            }
-        else:
-            # Create new episode
-            print(f"📝 Creating new episode: {episode.episode_id}")
-            query = """
-            g.addV('episode')
-                .property('id', episodeId)
-                .property('partitionKey', pk)
-                .property('content', content)
-                .property('source', source)
-                .property('timestamp', timestamp)
-                .property('created_at', createdAt)
-                .property('group_name', groupName)
-            """
-            
-            bindings = {
-                'episodeId': episode_id,
-                'pk': self.group_name,
-                'content': episode.content[:2000],  # Limit content length
-                'source': episode.source,
-                'timestamp': episode.timestamp.isoformat(),
-                'createdAt': datetime.now(timezone.utc).isoformat(),
-                'groupName': self.group_name
-            }
+        bindings = {
+            'episodeId': episode_id,
+            'pk': self.group_name,
+            'content': episode.content[:2000],  # Limit content length
+            'source': episode.source,
+            'timestamp': episode.timestamp.isoformat(),
+            'now': now,
+            'groupName': self.group_name
+        }
+        
+        result = await self._execute_gremlin_query(EPISODE_UPSERT_QUERY, bindings)
         
-        result = await self._execute_gremlin_query(query, bindings)
+        if result and result[0] == 'updated':
+            logger.debug("Episode %s already exists, updated", episode.episode_id)
+        else:
+            logger.debug("Created new episode: %s", episode.episode_id)
         
         return episode_id
     
-    async def _create_or_update_entity(self, entity: Entity, episode_id: str) -> str:
-        """Create or update entity vertex"""
-        entity_id = f"entity_{entity.name.replace(' ', '_').lower()}"
-        
-        # Check if entity exists
-        check_query = "g.V(entityId).hasLabel('entity')"
-        existing = await self._execute_gremlin_query(check_query, {'entityId': entity_id})
+    @staticmethod
+    def _entity_id(name: str) -> str:
+        """Vertex id for an entity name"""
+        return f"entity_{_slug(name)}"
+    
+    async def _create_or_update_entity(self, entity: Entity, episode_id: str,
+                                       now_iso: Optional[str] = None) -> str:
+        """Create or update entity vertex with a single upsert traversal"""
+        entity_id = entity.id
+        timestamp = now_iso or datetime.now(timezone.utc).isoformat()
+        description = entity.description or ''
         
-        if existing:
-            # Update existing entity
-            update_query = """
-            g.V(entityId)
-                .property('description', description)
-                .property('last_updated', timestamp)
-                .property('last_episode', episodeId)
-            """
+        if entity_id in self._entity_cache:
+            # Already written this session, so skip the existence check entirely
+            self._entity_cache.move_to_end(entity_id)
+            query = ENTITY_UPDATE_QUERY
             
             bindings = {
                 'entityId': entity_id,
-                'description': entity.description,
-                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'description': description,
+                'timestamp': timestamp,
                 'episodeId': episode_id
             }
         else:
-            # Create new entity
-            update_query = """
-            g.addV('entity')
-                .property('id', entityId)
-                .property('partitionKey', pk)
-                .property('name', name)
-                .property('entity_type', entityType)
-                .property('description', description)
-                .property('created_at', timestamp)
-                .property('group_name', groupName)
-                .property('first_episode', episodeId)
-            """
+            query = ENTITY_UPSERT_QUERY
             
             bindings = {
                 'entityId': entity_id,
                 'pk': self.group_name,
                 'name': entity.name,
                 'entityType': entity.entity_type.value,
-                'description': entity.description or '',
-                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'description': description,
+                'timestamp': timestamp,
                 'groupName': self.group_name,
                 'episodeId': episode_id
             }
         
-        result = await self._execute_gremlin_query(update_query, bindings)
+        try:
+            await self._execute_gremlin_query(query, bindings)
+        except GremlinServerError as e:
+            if not _is_conflict(e):
+                raise
+            # A concurrent episode created the vertex first; the upsert now takes its update branch
+            await self._execute_gremlin_query(query, bindings)
+        self._remember_entity(entity_id)
         
         # Store embedding if available
-        if entity.embedding:
+        if entity.embedding is not None and entity.embedding.size:
             await self._store_entity_embedding(entity_id, entity.embedding)
         
         return entity_id
-    async def _store_entity_embedding(self, entity_id: str, embedding: List[float]):
+    
+    def _remember_entity(self, entity_id: str):
+        """Record an entity id as written, evicting the least recently used beyond the bound"""
+        self._entity_cache[entity_id] = None
+        self._entity_cache.move_to_end(entity_id)
+        if len(self._entity_cache) > ENTITY_CACHE_SIZE:
+            self._entity_cache.popitem(last=False)
+    
+    async def _store_entity_embedding(self, entity_id: str, embedding: np.ndarray):
         """Store entity embedding (simplified - Gremlin API doesn't support vector search)"""
+        self._index_entity_embedding(entity_id, embedding)
+        
         # Note: Cosmos DB Gremlin API doesn't support vector storage/search
         # Azure Cosmos DB DOES support embeddings via NoSQL API with vector indexing
         # In production, you'd use either:
@@ -510,161 +979,280 @@ class GraphitiCosmos:
         # 2. Azure Cognitive Search for hybrid vector + text search
         # 3. Dual storage: Gremlin for graph + NoSQL for vectors
         
-        # Store embedding as a property (truncated for demo)
-        embedding_str = json.dumps(embedding[:10])  # Store only first 10 dimensions
+        # Store the full vector as base64-encoded float32 bytes (half the size of float64)
+        embedding_b64 = base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode('ascii')
         
-        query = "g.V(entityId).property('embedding_sample', embeddingStr)"
+        query = "g.V(entityId).property('embedding_f32_b64', embeddingB64)"
         bindings = {
             'entityId': entity_id,
-            'embeddingStr': embedding_str
+            'embeddingB64': embedding_b64
         }
         
         try:
-            result = await self._execute_gremlin_query(query, bindings)
+            await self._execute_gremlin_query(query, bindings)
         except Exception as e:
-            print(f"⚠️  Warning: Could not store embedding for {entity_id}: {e}")
+            logger.warning("Could not store embedding for %s: %s", entity_id, e)
     
-    async def _create_relationship_edge(self, source_id: str, target_id: str, 
-                                      relation_type: str, properties: Dict[str, Any] = None):
-        """Create relationship edge between vertices"""
+    def _index_entity_embedding(self, entity_id: str, embedding: np.ndarray):
+        """Add or replace an entity's normalized embedding in the in-memory ranking matrix"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm or (self._emb_ids and vector.shape[0] != self._emb_matrix.shape[1]):
+            return
+        
+        row = self._emb_rows.get(entity_id)
+        if row is None:
+            row = len(self._emb_ids)
+            if row == len(self._emb_matrix):
+                # Grow geometrically so appends stay amortized O(1)
+                grown = np.empty((max(64, row * 2), vector.shape[0]), dtype=np.float32)
+                if row:
+                    grown[:row] = self._emb_matrix[:row]
+                self._emb_matrix = grown
+            self._emb_ids.append(entity_id)
+            self._emb_rows[entity_id] = row
+        self._emb_matrix[row] = vector / norm
+    
+    def _rank_by_embedding(self, query_embedding: np.ndarray, limit: int) -> List[Tuple[str, float]]:
+        """Top entity ids by cosine similarity to the query, via one matrix-vector product"""
+        count = len(self._emb_ids)
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if not count or not norm or query_vector.shape[0] != self._emb_matrix.shape[1]:
+            return []
+        
+        scores = self._emb_matrix[:count] @ (query_vector / norm)
+        if count > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(count)
+        top = top[np.argsort(-scores[top])]
+        return [(self._emb_ids[i], float(scores[i])) for i in top]
+    
+    def _edge_traversal(self, source_id: str, target_id: str, relation_type: str,
+                        properties: Dict[str, Any] = None, suffix: str = '',
+                        now_iso: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """Build an addE traversal and its bindings; suffix keeps binding names unique in a batch"""
         properties = properties or {}
         
-        query = """
-        g.V(sourceId).addE(relationType).to(g.V(targetId))
-            .property('created_at', timestamp)
-            .property('group_name', groupName)
-        """
+        cache_key = (suffix, frozenset(properties))
+        query = self._edge_query_cache.get(cache_key)
+        if query is None:
+            query = (
+                f"g.V(sourceId{suffix}).addE(relationType{suffix}).to(g.V(targetId{suffix}))"
+                f".property('created_at', timestamp{suffix})"
+                f".property('group_name', groupName{suffix})"
+            )
+            query += ''.join(f".property('{key}', {key}{suffix})" for key in sorted(properties))
+            self._edge_query_cache[cache_key] = query
         
         bindings = {
-            'sourceId': source_id,
-            'targetId': target_id,
-            'relationType': relation_type,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'groupName': self.group_name
+            f'sourceId{suffix}': source_id,
+            f'targetId{suffix}': target_id,
+            f'relationType{suffix}': relation_type,
+            f'timestamp{suffix}': now_iso or datetime.now(timezone.utc).isoformat(),
+            f'groupName{suffix}': self.group_name
         }
         
         # Add additional properties
         for key, value in properties.items():
-            query += f".property('{key}', {key})"
-            bindings[key] = value
+            bindings[f'{key}{suffix}'] = value
+        
+        return query, bindings
+    
+    async def _create_relationship_edge(self, source_id: str, target_id: str, 
+                                      relation_type: str, properties: Dict[str, Any] = None,
+                                      now_iso: Optional[str] = None):
+        """Create relationship edge between vertices"""
+        query, bindings = self._edge_traversal(source_id, target_id, relation_type, properties, now_iso=now_iso)
         
         try:
-            result = await self._execute_gremlin_query(query, bindings)
+            await self._execute_gremlin_query(query, bindings)
         except Exception as e:
-            print(f"⚠️  Warning: Could not create relationship {source_id} -> {target_id}: {e}")
+            logger.warning("Could not create relationship %s -> %s: %s", source_id, target_id, e)
     
-    async def _create_relationship_from_entities(self, relationship: Relationship, episode_id: str):
-        """Create relationship edge from relationship object"""
-        source_id = f"entity_{relationship.source_entity.replace(' ', '_').lower()}"
-        target_id = f"entity_{relationship.target_entity.replace(' ', '_').lower()}"
+    async def _create_relationship_edges(self, edges: List[Tuple[str, str, str, Dict[str, Any]]],
+                                         now_iso: Optional[str] = None):
+        """Create many edges, chaining up to EDGE_BATCH_SIZE addE traversals per submit.
+
+        Every endpoint must already exist: a missing source vertex would silently
+        end the chained traversal for the edges after it.
+        """
+        now_iso = now_iso or datetime.now(timezone.utc).isoformat()
+        
+        async def submit_batch(batch):
+            query, bindings = 'g', {}
+            for i, (source_id, target_id, relation_type, properties) in enumerate(batch):
+                edge_query, edge_bindings = self._edge_traversal(
+                    source_id, target_id, relation_type, properties, suffix=f'_{i}', now_iso=now_iso
+                )
+                query += edge_query[1:]  # continue the traversal instead of starting at g
+                bindings.update(edge_bindings)
+            try:
+                await self._execute_gremlin_query(query, bindings)
+            except Exception as e:
+                logger.warning("Could not create %d relationships: %s", len(batch), e)
         
+        await asyncio.gather(*(
+            submit_batch(edges[i:i + EDGE_BATCH_SIZE]) for i in range(0, len(edges), EDGE_BATCH_SIZE)
+        ))
+    
+    def _relationship_edge(self, relationship: Relationship, episode_id: str) -> Tuple[str, str, str, Dict[str, Any]]:
+        """Resolve a relationship to (source_id, target_id, relation_type, properties)"""
         properties = {
             'description': relationship.description,
             'confidence': relationship.confidence,
             'episode_id': episode_id,
-            'valid_from': relationship.valid_from.isoformat()        }
+            'valid_from': relationship.valid_from.isoformat()
+        }
         
-        await self._create_relationship_edge(
-            source_id, target_id, relationship.relation_type.value, properties
+        return (
+            self._entity_id(relationship.source_entity),
+            self._entity_id(relationship.target_entity),
+            relationship.relation_type.value,
+            properties
         )
+    
+    async def _create_relationship_from_entities(self, relationship: Relationship, episode_id: str):
+        """Create relationship edge from relationship object"""
+        await self._create_relationship_edge(*self._relationship_edge(relationship, episode_id))
         
+    @_cached_read
     async def search_entities(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search entities using text similarity"""
         try:
             # Generate query embedding
             query_embedding = await self._generate_embedding(query)
             
-            # First try exact name match
-            exact_match_query = """
-            g.V().hasLabel('entity')
-                .has('group_name', groupName)
-                .has('name', searchTerm)
-                .valueMap(true)
-                .limit(limitCount)
-            """
-            
-            # Try a simpler approach - get all entities first then filter in Python
-            all_entities_query = """
-            g.V().hasLabel('entity')
-                .has('group_name', groupName)
-                .valueMap(true)
-                .limit(100)
-            """
+            entities = await self._match_entities_by_text(query, limit)
             
-            bindings = {
-                'groupName': self.group_name,
-                'limitCount': limit
-            }
+            # Hybrid ranking: text matches get a fixed boost on top of their cosine similarity.
+            # Entities found only by embedding must be similar enough to count as a match.
+            semantic = dict(self._rank_by_embedding(query_embedding, limit))
+            text_ids = {self._vertex_value(entity, 'id') for entity in entities}
+            missing_ids = [
+                entity_id for entity_id, score in semantic.items()
+                if entity_id not in text_ids and score >= SEMANTIC_MIN_SCORE
+            ]
+            if missing_ids:
+                entities = entities + await self._execute_gremlin_query(
+                    "g.V().has('partitionKey', groupName).has('id', within(entityIds)).hasLabel('entity')"
+                    + ENTITY_PROJECTION,
+                    {'groupName': self.group_name, 'entityIds': missing_ids}
+                )
             
-            # Try exact match first
-            entities = await self._execute_gremlin_query(exact_match_query, {
-                'groupName': self.group_name,
-                'searchTerm': query,
-                'limitCount': limit
-            })
+            def hybrid_score(entity):
+                entity_id = self._vertex_value(entity, 'id')
+                return (1.0 if entity_id in text_ids else 0.0) + semantic.get(entity_id, 0.0)
             
-            if not entities:
-                # Get all entities and filter in Python for better compatibility
-                all_entities = await self._execute_gremlin_query(all_entities_query, bindings)
-                
-                # Filter entities that contain the search term
-                entities = []
-                query_lower = query.lower()
-                for entity in all_entities:
-                    name = entity.get('name', [''])[0] if isinstance(entity.get('name', ['']), list) else entity.get('name', '')
-                    description = entity.get('description', [''])[0] if isinstance(entity.get('description', ['']), list) else entity.get('description', '')
-                    
-                    if (query_lower in name.lower() or query_lower in description.lower()):
-                        entities.append(entity)
-                        if len(entities) >= limit:
-                            break
+            entities = sorted(entities, key=hybrid_score, reverse=True)[:limit]
             
             # Format results
             formatted_entities = []
             for entity in entities:
                 try:
+                    fields = _flatten_valuemap(entity)
                     formatted_entity = {
-                        'id': entity.get('id', [''])[0] if isinstance(entity.get('id', ['']), list) else entity.get('id', ''),
-                        'name': entity.get('name', [''])[0] if isinstance(entity.get('name', ['']), list) else entity.get('name', ''),
-                        'type': entity.get('entity_type', [''])[0] if isinstance(entity.get('entity_type', ['']), list) else entity.get('entity_type', ''),
-                        'description': entity.get('description', [''])[0] if isinstance(entity.get('description', ['']), list) else entity.get('description', '')
+                        'id': fields.get('id', ''),
+                        'name': fields.get('name', ''),
+                        'type': fields.get('entity_type', ''),
+                        'description': fields.get('description', '')
                     }
                     formatted_entities.append(formatted_entity)
                 except Exception as format_error:
-                    print(f"Warning: Could not format entity: {format_error}")
-                    print(f"Raw entity: {entity}")
+                    logger.warning("Could not format entity %s: %s", entity, format_error)
             
             return formatted_entities
             
-        except Exception as e:
-            print(f"❌ Error searching entities: {e}")
+        except Exception:
+            logger.exception("Error searching entities")
             return []
-            
+    
+    async def search_entities_batch(self, queries: List[str], limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Search entities for several queries concurrently, embedding all of them in one request"""
+        # Warm the embedding cache so each search_entities call below skips its own request
+        await self._generate_embeddings(list(queries))
+        results = await asyncio.gather(*(self.search_entities(query, limit) for query in queries))
+        return dict(zip(queries, results))
+            
+    @staticmethod
+    def _vertex_value(vertex: Dict[str, Any], key: str) -> Any:
+        """Read a vertex map entry, unwrapping valueMap-style single-element property lists"""
+        value = vertex.get(key, '')
+        if isinstance(value, list):
+            return value[0] if value else ''
+        return value
+    
+    async def _match_entities_by_text(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Projected entities whose name equals query, else whose name or description contains it"""
+        # Try exact match first
+        entities = await self._execute_gremlin_query(ENTITY_EXACT_MATCH_QUERY, {
+            'groupName': self.group_name,
+            'searchTerm': query,
+            'limitCount': limit
+        })
+        if entities:
+            return entities
+        
+        # Substring match evaluated server-side so only matching vertices are returned.
+        # TextP predicates are case-sensitive, so try the common casings of the term.
+        predicates = []
+        bindings = {
+            'groupName': self.group_name,
+            'limitCount': limit
+        }
+        for i, term in enumerate(self._search_terms(query)):
+            predicates.append(f"has('name', containing(term{i}))")
+            predicates.append(f"has('description', containing(term{i}))")
+            bindings[f'term{i}'] = term
+        containing_query = f"""
+        g.V().has('partitionKey', groupName)
+            .has('group_name', groupName)
+            .hasLabel('entity')
+            .or({', '.join(predicates)})
+            .limit(limitCount)
+        """ + ENTITY_PROJECTION
+        try:
+            return await self._execute_gremlin_query(containing_query, bindings)
+        except GremlinServerError:
+            # Text predicates unsupported - filter a sample of entities in Python
+            return await self._filter_entities_locally(query, limit)
+    
+    async def _filter_entities_locally(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Fallback entity search that filters pages of limit entities in Python until enough match"""
+        # Filter entities that contain the search term
+        entities = []
+        query_lower = query.lower()
+        for page in range(SEARCH_MAX_PAGES):
+            rows = await self._execute_gremlin_query(ENTITY_PAGE_QUERY, {
+                'groupName': self.group_name,
+                'pageStart': page * limit,
+                'pageEnd': (page + 1) * limit
+            })
+            for entity in rows:
+                if (query_lower in str(entity.get('name', '')).lower()
+                        or query_lower in str(entity.get('description', '')).lower()):
+                    entities.append(entity)
+                    if len(entities) >= limit:
+                        return entities
+            if len(rows) < limit:
+                break
+        
+        return entities
+    
+    @_cached_read
     async def search_relationships(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search relationships using text similarity"""
         try:
-            # Simplified approach - get edges with basic info
-            simple_edges_query = """
-            g.E()
-                .has('group_name', groupName)
-                .limit(limitCount)
-                .as('edge')
-                .project('edge_props', 'edge_label', 'source_id', 'target_id')
-                .by(valueMap(true))
-                .by(label())
-                .by(outV().id())
-                .by(inV().id())
-            """
-            
+            # Fetch edges together with their endpoint names in one query
             bindings = {
                 'groupName': self.group_name,
                 'limitCount': limit * 2  # Get more to filter
             }
             
             # Get relationships
-            relationships_data = await self._execute_gremlin_query(simple_edges_query, bindings)
+            relationships_data = await self._execute_gremlin_query(RELATIONSHIP_EDGES_QUERY, bindings)
             
-            # Now get the vertex names separately for each relationship
             formatted_relationships = []
             query_lower = query.lower()
             
@@ -672,41 +1260,19 @@ class GraphitiCosmos:
                 try:
                     edge_props = rel_data.get('edge_props', {})
                     edge_label = rel_data.get('edge_label', 'unknown')
-                    source_id = rel_data.get('source_id')
-                    target_id = rel_data.get('target_id')
                     
                     # Handle list vs single results
                     if isinstance(edge_label, list) and edge_label:
                         edge_label = edge_label[0]
                     
-                    # Get vertex names separately
-                    source_name = "Unknown"
-                    target_name = "Unknown"
-                    
-                    try:
-                        # Get source vertex name
-                        source_query = "g.V(sourceId).values('name')"
-                        source_result = await self._execute_gremlin_query(source_query, {'sourceId': source_id})
-                        if source_result and isinstance(source_result, list) and source_result:
-                            source_name = source_result[0]
-                            if isinstance(source_name, list):
-                                source_name = source_name[0]
-                    except:
-                        pass
-                    
-                    try:
-                        # Get target vertex name
-                        target_query = "g.V(targetId).values('name')"
-                        target_result = await self._execute_gremlin_query(target_query, {'targetId': target_id})
-                        if target_result and isinstance(target_result, list) and target_result:
-                            target_name = target_result[0]
-                            if isinstance(target_name, list):
-                                target_name = target_name[0]
-                    except:
-                        pass
+                    # Vertices without a name (e.g. episodes) come back as empty lists
+                    source_name = rel_data.get('source_name') or ["Unknown"]
+                    target_name = rel_data.get('target_name') or ["Unknown"]
+                    source_name = source_name[0] if isinstance(source_name, list) else source_name
+                    target_name = target_name[0] if isinstance(target_name, list) else target_name
                     
                     # Check if the query matches
-                    edge_description = edge_props.get('description', [''])[0] if isinstance(edge_props.get('description', ['']), list) else edge_props.get('description', '')
+                    edge_description = self._vertex_value(edge_props, 'description')
                     
                     if (query_lower in edge_label.lower() or 
                         query_lower in edge_description.lower() or
@@ -726,173 +1292,353 @@ class GraphitiCosmos:
                             break
                             
                 except Exception as e:
-                    print(f"Warning: Could not process relationship: {e}")
+                    logger.warning("Could not process relationship: %s", e)
             
             return formatted_relationships
             
-        except Exception as e:
-            print(f"❌ Error searching relationships: {e}")
+        except Exception:
+            logger.exception("Error searching relationships")
             return []
             
+    @_cached_read
     async def get_entity_neighbors(self, entity_name: str, max_hops: int = 2) -> Dict[str, Any]:
         """Get neighboring entities and relationships"""
+        if not entity_name or not entity_name.strip():
+            return _empty_neighborhood(entity_name)
+        
         try:
-            # First, search for the entity to get the correct ID
-            search_results = await self.search_entities(entity_name, limit=1)
-            
-            if not search_results:
-                print(f"Entity '{entity_name}' not found")
-                return {'center_entity': entity_name, 'entities': [], 'relationships': [], 'paths': []}
-            
-            # Get the ID from the search result
-            entity_id = search_results[0]['id']
-            
-            # Find direct neighbors without using complex path queries
-            direct_query = """
-            g.V(entityId)
-                .bothE()
-                .as('e')
-                .bothV()
-                .as('v')
-                .select('e', 'v')
-                .by(valueMap(true))
-                .by(valueMap(true))
-                .limit(20)
-            """
-            
-            bindings = {
-                'entityId': entity_id
-            }
-            
-            neighbors_data = await self._execute_gremlin_query(direct_query, bindings)
+            rows = [row async for row in self.iter_entity_neighbors(entity_name, limit=20)]
+            if not rows:
+                return _empty_neighborhood(entity_name)
             
             # Format the results into entities and relationships
-            entities = set()
-            relationships = []
-            
-            for item in neighbors_data:
-                if isinstance(item, dict) and 'e' in item and 'v' in item:
-                    # Extract edge data
-                    edge = item['e']
-                    vertex = item['v']
-                    
-                    # Format vertex as entity
-                    if isinstance(vertex, dict) and 'name' in vertex:
-                        entity_name = vertex['name']
-                        if isinstance(entity_name, list):
-                            entity_name = entity_name[0]
-                        entities.add(entity_name)
-                    
-                    # Format edge as relationship
-                    if isinstance(edge, dict) and 'label' in edge:
-                        rel_type = edge.get('label', 'unknown')
-                        relationships.append({
-                            'relationship': rel_type,
-                            'properties': edge
-                        })
+            entities = list(dict.fromkeys(row['entity'] for row in rows if row['entity']))
+            relationships = [
+                {'relationship': row['relationship'], 'properties': row['properties']}
+                for row in rows if row['relationship']
+            ]
             
             # Process and format the neighborhood
             neighborhood = {
                 'center_entity': entity_name,
-                'entities': list(entities),
-                'relationships': relationships,
-                'paths': []  # Complex paths handling is problematic, use simpler approach
+                'entities': entities,
+                'relationships': relationships
             }
             
             return neighborhood
             
-        except Exception as e:
-            print(f"❌ Error getting entity neighbors: {e}")
-            return {'center_entity': entity_name, 'entities': [], 'relationships': [], 'paths': []}
+        except Exception:
+            logger.exception("Error getting entity neighbors")
+            return _empty_neighborhood(entity_name)
     
-    async def get_graph_stats(self) -> Dict[str, int]:
-        """Get basic statistics about the knowledge graph"""
+    async def iter_entity_neighbors(self, entity_name: str, limit: int = 20) -> AsyncIterator[Dict[str, Any]]:
+        """Yield an entity's neighbors one edge at a time, fetching NEIGHBOR_PAGE_SIZE rows per query.
+
+        Each item has the neighbor's name ('entity'), the edge label
+        ('relationship') and the projected edge ('properties'), so callers can
+        stop early without the rest of a high-degree vertex being fetched.
+        """
+        # Resolve the name by text only, so an unknown name never resolves to a merely similar entity
+        matches = await self._match_entities_by_text(entity_name, 1)
+        if not matches:
+            logger.info("Entity '%s' not found", entity_name)
+            return
+        
+        # Find direct neighbors without using complex path queries
+        for start in range(0, limit, NEIGHBOR_PAGE_SIZE):
+            end = min(start + NEIGHBOR_PAGE_SIZE, limit)
+            rows = await self._execute_gremlin_query(NEIGHBORS_PAGE_QUERY, {
+                'entityId': self._vertex_value(matches[0], 'id'),
+                'groupName': self.group_name,
+                'pageStart': start,
+                'pageEnd': end
+            })
+            for item in rows:
+                if isinstance(item, dict) and 'e' in item and 'v' in item:
+                    yield {
+                        'entity': self._vertex_value(item['v'], 'name'),
+                        'relationship': item['e'].get('label'),
+                        'properties': item['e']
+                    }
+            if len(rows) < end - start:
+                return
+    
+    @_cached_read
+    async def get_entity_neighbors_batch(self, entity_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get direct neighbors of several entities, matched by exact name, in one traversal"""
+        neighborhoods = {
+            name: _empty_neighborhood(name)
+            for name in entity_names
+        }
+        if not entity_names:
+            return neighborhoods
+        
         try:
-            stats = {}
-            
-            # Count episodes
-            episode_query = "g.V().hasLabel('episode').has('group_name', groupName).count()"
-            episode_result = await self._execute_gremlin_query(episode_query, {'groupName': self.group_name})
-            stats['episodes'] = episode_result[0] if episode_result else 0
-            
-            # Count entities
-            entity_query = "g.V().hasLabel('entity').has('group_name', groupName).count()"
-            entity_result = await self._execute_gremlin_query(entity_query, {'groupName': self.group_name})
-            stats['entities'] = entity_result[0] if entity_result else 0
-            
-            # Count relationships
-            rel_query = "g.E().has('group_name', groupName).count()"
-            rel_result = await self._execute_gremlin_query(rel_query, {'groupName': self.group_name})
-            stats['relationships'] = rel_result[0] if rel_result else 0
+            neighbors_data = await self._execute_gremlin_query(NEIGHBORS_BATCH_QUERY, {
+                'groupName': self.group_name,
+                'entityNames': list(entity_names),
+                'limitCount': 20 * len(entity_names)
+            })
             
-            return stats
-        except Exception as e:
-            print(f"❌ Error getting graph stats: {e}")
+            # Group rows by the entity they were reached from
+            seen_entities = {name: set() for name in entity_names}
+            for item in neighbors_data:
+                neighborhood = neighborhoods.get(item.get('src'))
+                if neighborhood is None:
+                    continue
+                
+                vertex_name = self._vertex_value(item.get('v', {}), 'name')
+                if vertex_name and vertex_name not in seen_entities[item['src']]:
+                    seen_entities[item['src']].add(vertex_name)
+                    neighborhood['entities'].append(vertex_name)
+                
+                edge = item.get('e', {})
+                if 'label' in edge:
+                    neighborhood['relationships'].append({
+                        'relationship': edge['label'],
+                        'properties': edge
+                    })
+            
+            return neighborhoods
+            
+        except Exception:
+            logger.exception("Error getting entity neighbors")
+            return neighborhoods
+    
+    @_cached_read
+    async def get_graph_stats(self) -> Dict[str, int]:
+        """Get basic statistics about the knowledge graph.
+
+        Counted from the graph on every read-cache miss, so writes from other
+        clients and concurrent episodes show up once the cached result expires.
+        """
+        try:
+            return await self._scan_graph_stats()
+        except Exception:
+            logger.exception("Error getting graph stats")
             return {'episodes': 0, 'entities': 0, 'relationships': 0}
     
+    async def _scan_graph_stats(self) -> Dict[str, int]:
+        """Count episodes, entities and relationships by scanning the group's vertices"""
+        # All three counts in one traversal over the group's vertices
+        try:
+            result = await self._execute_gremlin_query(GRAPH_STATS_QUERY, {'groupName': self.group_name})
+            if result:
+                return {key: int(result[0].get(key, 0)) for key in ('episodes', 'entities', 'relationships')}
+        except GremlinServerError:
+            pass
+        
+        # Fall back to separate counts
+        return await self._count_graph_elements()
+    
+    async def _count_graph_elements(self) -> Dict[str, int]:
+        """Count episodes, entities and relationships with three concurrent queries"""
+        count_queries = {
+            'episodes': "g.V().has('partitionKey', groupName).has('group_name', groupName).hasLabel('episode').count()",
+            'entities': "g.V().has('partitionKey', groupName).has('group_name', groupName).hasLabel('entity').count()",
+            'relationships': "g.V().has('partitionKey', groupName).outE().has('group_name', groupName).count()"
+        }
+        
+        # Independent counts run concurrently; one failing only zeroes its own count
+        results = await asyncio.gather(
+            *(self._execute_gremlin_query(query, {'groupName': self.group_name})
+              for query in count_queries.values()),
+            return_exceptions=True
+        )
+        
+        stats = {}
+        for key, result in zip(count_queries, results):
+            if isinstance(result, Exception):
+                logger.warning("Could not count %s: %s", key, result)
+                result = None
+            stats[key] = result[0] if result else 0
+        
+        return stats
+    
+    @_cached_read
     async def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """General search method that searches both entities and relationships"""
+        if not query or not query.strip() or limit <= 0:
+            return []
+        
         try:
-            # Search entities
-            entity_results = await self.search_entities(query, limit//2)
-            
-            # Search relationships  
-            relationship_results = await self.search_relationships(query, limit//2)
-            
-            # Combine and flatten results for easier access
-            combined_results = []
+            try:
+                return await self._search_union(query, limit)
+            except GremlinServerError:
+                pass  # Text predicates unsupported - run the separate searches below
+            
+            # Search entities and relationships concurrently, rounding up so odd limits fill
+            half = (limit + 1) // 2
+            entity_results, relationship_results = await asyncio.gather(
+                self.search_entities(query, half),
+                self.search_relationships(query, half)
+            )
             
-            # Add entities in a simplified format
-            for entity in entity_results:
-                combined_results.append({
+            # Combine and flatten results for easier access, entities first
+            combined_results = [
+                {
                     'type': 'entity',
                     'name': entity.get('name', ''),
                     'description': entity.get('description', ''),
                     'entity_type': entity.get('type', ''),
                     'source': 'entity_search'
-                })
-            
-            # Add relationships in a simplified format
-            for rel in relationship_results:
-                combined_results.append({
-                    'type': 'relationship', 
-                    'name': f"{rel.get('source', '')} → {rel.get('target', '')}",
+                }
+                for entity in entity_results
+            ]
+            combined_results.extend(
+                {
+                    'type': 'relationship',
+                    'name': _ARROW.join((rel.get('source', ''), rel.get('target', ''))),
                     'description': rel.get('relationship', ''),
                     'relationship_type': rel.get('relationship', ''),
                     'source': 'relationship_search'
-                })
+                }
+                for rel in relationship_results
+            )
             
             return combined_results[:limit]
             
-        except Exception as e:
-            print(f"❌ Error in general search: {e}")
+        except Exception:
+            logger.exception("Error in general search")
             return []
 
+    async def _cached(self, key: tuple, factory) -> Any:
+        """Return a fresh cached result for key, otherwise await factory() and cache it.
+
+        Callers always get their own deep copy, so mutating a result can't change later cache hits.
+        """
+        ttl = self.config.read_cache_ttl
+        if ttl <= 0:
+            return await factory()
+        
+        now = time.monotonic()
+        entry = self._read_cache.get(key)
+        if entry is not None and entry[0] > now:
+            self._read_cache.move_to_end(key)
+            return copy.deepcopy(entry[1])
+        
+        result = await factory()
+        self._read_cache[key] = (now + ttl, copy.deepcopy(result))
+        self._read_cache.move_to_end(key)
+        while len(self._read_cache) > READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _search_terms(query: str) -> List[str]:
+        """Casings of a search term to try, since TextP predicates are case-sensitive"""
+        return list(dict.fromkeys([query, query.lower(), query.title()]))
+    
+    async def _search_union(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Search entities and relationships server-side in a single union() traversal"""
+        half = (limit + 1) // 2
+        bindings = {
+            'groupName': self.group_name,
+            'entityLimit': half,
+            'relationshipLimit': half
+        }
+        entity_predicates, edge_predicates = [], []
+        for i, term in enumerate(self._search_terms(query)):
+            bindings[f'term{i}'] = term
+            entity_predicates += [f"has('name', containing(term{i}))", f"has('description', containing(term{i}))"]
+            edge_predicates += [
+                f"has('description', containing(term{i}))",
+                f"where(outV().has('name', containing(term{i})))",
+                f"where(inV().has('name', containing(term{i})))"
+            ]
+        # Edge labels come from a fixed set, so match them here instead of on the server
+        query_lower = query.lower()
+        labels = [label for label in ['mentions', *_RELATION_BY_VALUE] if query_lower in label]
+        if labels:
+            edge_predicates.append(f"hasLabel({', '.join(repr(label) for label in labels)})")
+        
+        union_query = f"""
+        g.inject(0).union(
+            V().has('partitionKey', groupName).has('group_name', groupName).hasLabel('entity')
+                .or({', '.join(entity_predicates)})
+                .limit(entityLimit)
+                .project('kind', 'name', 'entity_type', 'description')
+                .by(constant('entity'))
+                .by('name')
+                .by(coalesce(values('entity_type'), constant('')))
+                .by(coalesce(values('description'), constant(''))),
+            V().has('partitionKey', groupName).outE().has('group_name', groupName)
+                .or({', '.join(edge_predicates)})
+                .limit(relationshipLimit)
+                .project('kind', 'source', 'target', 'relationship')
+                .by(constant('relationship'))
+                .by(outV().values('name').fold())
+                .by(inV().values('name').fold())
+                .by(label())
+        )
+        """
+        rows = await self._execute_gremlin_query(union_query, bindings)
+        
+        entity_results, relationship_results = [], []
+        for row in rows:
+            if row.get('kind') == 'entity':
+                entity_results.append({
+                    'type': 'entity',
+                    'name': row.get('name', ''),
+                    'description': row.get('description', ''),
+                    'entity_type': row.get('entity_type', ''),
+                    'source': 'entity_search'
+                })
+            else:
+                # Vertices without a name (e.g. episodes) come back as empty lists
+                source_name = (row.get('source') or ['Unknown'])[0]
+                target_name = (row.get('target') or ['Unknown'])[0]
+                relationship_results.append({
+                    'type': 'relationship',
+                    'name': _ARROW.join((source_name, target_name)),
+                    'description': row.get('relationship', ''),
+                    'relationship_type': row.get('relationship', ''),
+                    'source': 'relationship_search'
+                })
+        
+        return (entity_results + relationship_results)[:limit]
+    
     async def close(self):
-        """Clean up resources"""
+        """Clean up resources; initialize() may be called again afterwards to reconnect"""
         try:
+            if self._keepalive_task:
+                self._keepalive_task.cancel()
+                try:
+                    await self._keepalive_task
+                except asyncio.CancelledError:
+                    pass
             if self.openai_client:
                 await self.openai_client.close()
             if self.gremlin_client:
                 # Use executor to avoid event loop conflicts
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(None, self.gremlin_client.close)
-            print("✅ Graphiti-Cosmos client closed")
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._gremlin_executor, self.gremlin_client.close)
+            # Let in-flight submits finish without blocking the event loop
+            if self._gremlin_executor is not None:
+                await asyncio.to_thread(self._gremlin_executor.shutdown, wait=True)
+            logger.info("Graphiti-Cosmos client closed")
         except Exception as e:
-            print(f"⚠️  Warning during cleanup: {e}")
+            logger.warning("Error during cleanup: %s", e)
             # Don't raise - cleanup should be best effort
+        finally:
+            self._keepalive_task = None
+            self.openai_client = None
+            self.gremlin_client = None
+            self._gremlin_executor = None
 
 
 # Example usage functions
 async def demo_graphiti_cosmos():
-    """Demonstrate Graphiti-Cosmos functionality"""
+    """Demonstrate Graphiti-Cosmos functionality.
+
+    Episodes are ingested EPISODE_CONCURRENCY at a time, so N episodes take
+    about ceil(N / EPISODE_CONCURRENCY) extraction-and-write latencies
+    instead of N.
+    """
     print("🚀 Starting Graphiti-Cosmos Demo")
     
-    # Initialize the system
-    graphiti = GraphitiCosmos()
-    await graphiti.initialize()
-    
-    try:
+    # One instance (and Gremlin connection pool) for the whole run, closed on exit
+    async with GraphitiCosmos() as graphiti:
         # Add some sample episodes
         episodes = [
             Episode(
@@ -912,9 +1658,16 @@ async def demo_graphiti_cosmos():
             )
         ]
         
-        # Process episodes
-        for episode in episodes:
-            await graphiti.add_episode(episode)
+        # Process episodes concurrently, EPISODE_CONCURRENCY at a time
+        semaphore = asyncio.Semaphore(EPISODE_CONCURRENCY)
+        
+        async def add_episode(episode: Episode):
+            async with semaphore:
+                await graphiti.add_episode(episode)
+        
+        async with asyncio.TaskGroup() as tg:
+            for episode in episodes:
+                tg.create_task(add_episode(episode))
         
         # Search for entities
         print("\n🔍 Searching for entities related to 'Microsoft':")
@@ -935,10 +1688,8 @@ async def demo_graphiti_cosmos():
             print(f"  - {key.title()}: {value}")
         
         print("\n✅ Demo completed successfully!")
-        
-    finally:
-        await graphiti.close()
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
     asyncio.run(demo_graphiti_cosmos())
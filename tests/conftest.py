@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The library and the loader scripts are imported as top-level modules, like the demos do
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT_DIR, 'src'), os.path.join(ROOT_DIR, 'scripts')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
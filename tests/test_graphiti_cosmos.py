@@ -0,0 +1,377 @@
+"""Unit tests for GraphitiCosmos against stubbed Gremlin and OpenAI clients"""
+
+import asyncio
+import json
+import logging
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from gremlin_python.driver.protocol import GremlinServerError
+
+import graphiti_cosmos
+from graphiti_cosmos import Entity, EntityType, GraphitiCosmos, GraphitiCosmosConfig, _retry_delay, _slug
+
+
+class StubResultSet:
+    def __init__(self, result):
+        self._result = result
+
+    def all(self):
+        future = Future()
+        future.set_result(self._result)
+        return future
+
+
+class StubGremlinClient:
+    """Records submitted queries and answers them with answer(query, bindings)"""
+
+    def __init__(self, answer=lambda query, bindings: []):
+        self.answer = answer
+        self.calls = []
+
+    def submit(self, query, bindings=None):
+        self.calls.append((query, bindings))
+        return StubResultSet(self.answer(query, bindings))
+
+    def close(self):
+        pass
+
+
+class StubCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=self.replies.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class StubEmbeddings:
+    async def create(self, model, input, **kwargs):
+        inputs = input if isinstance(input, list) else [input]
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(text)), 1.0, 2.0]) for i, text in enumerate(inputs)
+        ])
+
+
+class StubOpenAI:
+    def __init__(self, replies=()):
+        self.chat = SimpleNamespace(completions=StubCompletions(replies))
+        self.embeddings = StubEmbeddings()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def make_graphiti(monkeypatch):
+    """Build a GraphitiCosmos wired to stub clients instead of Cosmos DB and Azure OpenAI"""
+    for var in ('COSMOS_ENDPOINT', 'COSMOS_USERNAME', 'COSMOS_PASSWORD', 'AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_KEY'):
+        monkeypatch.setenv(var, 'test')
+    monkeypatch.setenv('GRAPHITI_GROUP_NAME', 'test_graph')
+    instances = []
+
+    def make(gremlin_client=None, replies=()):
+        graphiti = GraphitiCosmos(GraphitiCosmosConfig())
+        graphiti.gremlin_client = gremlin_client or StubGremlinClient()
+        graphiti.openai_client = StubOpenAI(replies)
+        instances.append(graphiti)
+        return graphiti
+
+    yield make
+    for graphiti in instances:
+        if graphiti._gremlin_executor is not None:
+            graphiti._gremlin_executor.shutdown(wait=False)
+
+
+def test_slug_keeps_the_original_id_form():
+    # Ids written by earlier versions must stay stable so re-ingesting doesn't duplicate entities
+    assert _slug('GPT-4 Turbo') == 'gpt-4_turbo'
+    assert _slug("O'Reilly Media") == "o'reilly_media"
+
+
+def test_slug_keeps_distinct_names_distinct():
+    assert len({_slug('C++'), _slug('C#'), _slug('C')}) == 3
+
+
+def test_slug_replaces_characters_cosmos_rejects_in_ids():
+    slug = _slug('AC/DC \\ Who? #1')
+    assert not set('/\\?#') & set(slug)
+    assert slug == 'ac_dc___who___1'
+
+
+def test_entity_id_is_derived_from_the_slug():
+    entity = Entity(name='Elena Rodriguez', entity_type=EntityType.PERSON)
+    assert entity.id == 'entity_elena_rodriguez'
+
+
+async def test_empty_neighborhoods_have_fresh_lists(make_graphiti):
+    graphiti = make_graphiti()
+
+    for name in ('', 'Nobody'):
+        neighborhood = await graphiti.get_entity_neighbors(name)
+        assert neighborhood == {'center_entity': name, 'entities': [], 'relationships': []}
+        neighborhood['entities'].append('mutated')
+
+    assert (await graphiti.get_entity_neighbors('Someone else'))['entities'] == []
+
+
+def stats_client(counts):
+    """Stub client answering the graph stats query with the current counts"""
+    return StubGremlinClient(lambda query, bindings: [dict(counts)])
+
+
+async def test_cached_read_serves_repeated_calls_from_the_cache(make_graphiti):
+    gremlin_client = stats_client({'episodes': 1, 'entities': 2, 'relationships': 3})
+    graphiti = make_graphiti(gremlin_client)
+
+    first = await graphiti.get_graph_stats()
+    second = await graphiti.get_graph_stats()
+
+    assert first == second == {'episodes': 1, 'entities': 2, 'relationships': 3}
+    assert len(gremlin_client.calls) == 1
+
+
+async def test_cached_read_is_invalidated_by_graph_writes(make_graphiti):
+    counts = {'episodes': 1, 'entities': 2, 'relationships': 3}
+    gremlin_client = stats_client(counts)
+    graphiti = make_graphiti(gremlin_client)
+
+    await graphiti.get_graph_stats()
+    counts['episodes'] = 2
+    # add_episode bumps the version whether or not it succeeds
+    graphiti._graph_version += 1
+
+    assert (await graphiti.get_graph_stats())['episodes'] == 2
+    assert len(gremlin_client.calls) == 2
+
+
+async def test_cached_read_expires_after_the_ttl(make_graphiti, monkeypatch):
+    counts = {'episodes': 1, 'entities': 2, 'relationships': 3}
+    graphiti = make_graphiti(stats_client(counts))
+    now = [1000.0]
+    monkeypatch.setattr(graphiti_cosmos.time, 'monotonic', lambda: now[0])
+
+    await graphiti.get_graph_stats()
+    counts['entities'] = 5
+    assert (await graphiti.get_graph_stats())['entities'] == 2
+
+    now[0] += graphiti.config.read_cache_ttl + 1
+    assert (await graphiti.get_graph_stats())['entities'] == 5
+
+
+async def test_cached_read_returns_independent_copies(make_graphiti):
+    rows = [{'entity': 'Bob', 'relationship': 'works_for', 'properties': {'since': [2020]}}]
+    graphiti = make_graphiti()
+
+    async def iter_entity_neighbors(entity_name, limit=20):
+        for row in rows:
+            yield row
+
+    graphiti.iter_entity_neighbors = iter_entity_neighbors
+
+    first = await graphiti.get_entity_neighbors('Alice')
+    first['entities'].append('Mallory')
+    first['relationships'][0]['properties']['since'].append(1999)
+
+    second = await graphiti.get_entity_neighbors('Alice')
+    assert second['entities'] == ['Bob']
+    assert second['relationships'][0]['properties'] == {'since': [2020]}
+
+
+async def test_cached_read_is_disabled_with_zero_ttl(make_graphiti, monkeypatch):
+    monkeypatch.setenv('GRAPHITI_READ_CACHE_TTL', '0')
+    gremlin_client = stats_client({'episodes': 1, 'entities': 2, 'relationships': 3})
+    graphiti = make_graphiti(gremlin_client)
+
+    await graphiti.get_graph_stats()
+    await graphiti.get_graph_stats()
+
+    assert len(gremlin_client.calls) == 2
+
+
+async def test_initialize_reconnects_after_close(make_graphiti, monkeypatch):
+    monkeypatch.setenv('AZURE_OPENAI_API_VERSION', '2024-02-01')
+    graphiti = make_graphiti(stats_client({'episodes': 1, 'entities': 0, 'relationships': 0}))
+    await graphiti.close()
+
+    assert graphiti.gremlin_client is None
+    with pytest.raises(RuntimeError):
+        await graphiti._execute_gremlin_query('g.V().count()')
+
+    reconnected = stats_client({'episodes': 4, 'entities': 0, 'relationships': 0})
+    monkeypatch.setattr(graphiti_cosmos.client, 'Client', lambda *args, **kwargs: reconnected)
+    await graphiti.initialize()
+    try:
+        assert graphiti.gremlin_client is reconnected
+        assert (await graphiti._execute_gremlin_query('g.V().count()'))[0]['episodes'] == 4
+    finally:
+        await graphiti.close()
+
+
+async def test_keepalive_ping_failures_are_not_errors(make_graphiti, monkeypatch, caplog):
+    def answer(query, bindings):
+        raise ConnectionError("socket closed")
+
+    gremlin_client = StubGremlinClient(answer)
+    graphiti = make_graphiti(gremlin_client)
+    monkeypatch.setattr(graphiti_cosmos, 'KEEPALIVE_INTERVAL', 0)
+
+    task = asyncio.create_task(graphiti._keepalive())
+    while len(gremlin_client.calls) < 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert gremlin_client.calls[0] == ('g.inject(0)', None)
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+
+def throttled_error(retry_after=None):
+    attributes = {'x-ms-status-code': 429}
+    if retry_after is not None:
+        attributes['x-ms-retry-after-ms'] = retry_after
+    return GremlinServerError({'code': 500, 'message': 'Request rate is large', 'attributes': attributes})
+
+
+def test_retry_delay_honors_the_retry_after_hint():
+    assert _retry_delay(throttled_error('15'), 0) == pytest.approx(0.015)
+    assert _retry_delay(throttled_error('00:00:01.5000000'), 0) == pytest.approx(1.5)
+
+
+def test_retry_delay_falls_back_to_backoff_for_unparseable_hints():
+    for retry_after in ('soon', '1:2', None):
+        delay = _retry_delay(throttled_error(retry_after), 2)
+        assert graphiti_cosmos.RETRY_BASE_DELAY * 4 <= delay <= graphiti_cosmos.RETRY_BASE_DELAY * 5
+
+
+async def test_throttled_query_backs_off_without_holding_the_semaphore(make_graphiti, monkeypatch):
+    monkeypatch.setenv('GRAPHITI_MAX_CONCURRENCY', '1')
+    throttled = []
+
+    def answer(query, bindings):
+        if query == 'throttled' and not throttled:
+            throttled.append(query)
+            raise throttled_error('200')
+        return [query]
+
+    graphiti = make_graphiti(StubGremlinClient(answer))
+    slow = asyncio.create_task(graphiti._execute_gremlin_query('throttled'))
+    while not throttled:
+        await asyncio.sleep(0.01)
+
+    # Served while the throttled query is still backing off
+    assert await asyncio.wait_for(graphiti._execute_gremlin_query('other'), 0.1) == ['other']
+    assert await slow == ['throttled']
+
+
+def test_chunk_text_keeps_short_content_whole():
+    assert GraphitiCosmos._chunk_text('Alice works for Contoso.') == ['Alice works for Contoso.']
+
+
+def test_chunk_text_splits_on_whitespace_with_overlap():
+    content = ' '.join(f"word{i}" for i in range(400))
+    chunks = GraphitiCosmos._chunk_text(content, max_chars=200, overlap=20)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert chunks[0] == content[:len(chunks[0])]
+    assert content.endswith(chunks[-1])
+    for previous, following in zip(chunks, chunks[1:]):
+        # Each chunk repeats the tail of the one before and ends on a word boundary
+        assert following.startswith(previous[-20:])
+        assert content[content.index(previous) + len(previous)] == ' '
+
+
+def extraction(entities=(), relationships=()):
+    return json.dumps({
+        'entities': [{'name': name, 'type': kind, 'description': description} for name, kind, description in entities],
+        'relationships': [
+            {'source': source, 'target': target, 'type': kind, 'description': '', 'confidence': 0.9}
+            for source, target, kind in relationships
+        ]
+    })
+
+
+async def test_extract_graph_merges_chunks(make_graphiti):
+    replies = {
+        'chunk one': extraction(
+            [('Alice', 'person', 'an engineer'), ('Contoso', 'organization', 'a company')],
+            [('Alice', 'Contoso', 'works_for')]
+        ),
+        'chunk two': extraction(
+            [('alice', 'person', 'mentioned again'), ('Seattle', 'location', 'a city')],
+            [('alice', 'Contoso', 'works_for'), ('Contoso', 'Seattle', 'located_in'), ('Alice', 'Bob', 'related_to')]
+        ),
+    }
+    graphiti = make_graphiti()
+    graphiti._chunk_text = lambda content: ['chunk one', 'chunk two', 'chunk three']
+
+    async def create(messages, **kwargs):
+        prompt = messages[0]['content']
+        for chunk, reply in replies.items():
+            if chunk in prompt:
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+        raise TimeoutError("chunk three failed")
+
+    graphiti.openai_client.chat.completions.create = create
+
+    entities, relationships = await graphiti._extract_graph('content long enough to chunk')
+
+    # First occurrence wins, matched case-insensitively; the failed chunk is skipped
+    assert [(entity.name, entity.description) for entity in entities] == [
+        ('Alice', 'an engineer'), ('Contoso', 'a company'), ('Seattle', 'a city')
+    ]
+    assert all(entity.embedding is not None and entity.embedding.dtype == np.float32 for entity in entities)
+    # Duplicates across chunks collapse, and relationships to unknown entities (Bob) are dropped
+    assert [(r.source_entity, r.target_entity, r.relation_type.value) for r in relationships] == [
+        ('Alice', 'Contoso', 'works_for'), ('Contoso', 'Seattle', 'located_in')
+    ]
+
+
+async def test_extract_graph_skips_blank_content(make_graphiti):
+    graphiti = make_graphiti()
+
+    assert await graphiti._extract_graph('   ') == ([], [])
+    assert graphiti.openai_client.chat.completions.calls == []
+
+
+def entity_row(entity_id, name):
+    return {'id': entity_id, 'name': name, 'entity_type': 'concept', 'description': ''}
+
+
+def semantic_only_client():
+    """Stub client with no text matches that returns entities looked up by id"""
+    def answer(query, bindings):
+        if 'entityIds' in bindings:
+            return [entity_row(entity_id, entity_id) for entity_id in bindings['entityIds']]
+        return []
+
+    return StubGremlinClient(answer)
+
+
+async def test_search_entities_requires_a_minimum_similarity_for_semantic_hits(make_graphiti):
+    graphiti = make_graphiti(semantic_only_client())
+    # The stub embeds 'zzz' as [3, 1, 2]
+    graphiti._index_entity_embedding('entity_similar', np.array([3.0, 1.0, 2.1], dtype=np.float32))
+    graphiti._index_entity_embedding('entity_unrelated', np.array([-3.0, 1.0, -2.0], dtype=np.float32))
+
+    results = await graphiti.search_entities('zzz')
+
+    assert [result['id'] for result in results] == ['entity_similar']
+
+
+async def test_entity_neighbors_never_resolve_through_embeddings(make_graphiti):
+    gremlin_client = semantic_only_client()
+    graphiti = make_graphiti(gremlin_client)
+    graphiti._index_entity_embedding('entity_similar', np.array([3.0, 1.0, 2.0], dtype=np.float32))
+
+    neighborhood = await graphiti.get_entity_neighbors('zzz')
+
+    assert neighborhood == {'center_entity': 'zzz', 'entities': [], 'relationships': []}
+    assert not [query for query, _ in gremlin_client.calls if 'entityId' in query]
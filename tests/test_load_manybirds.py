@@ -0,0 +1,340 @@
+"""Tests for the batched Gremlin product loader"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from gremlin_python.driver.protocol import GremlinServerError
+
+import load_manybirds_to_cosmos as loader
+
+
+class StubResultSet:
+    def __init__(self, result):
+        self._result = result
+
+    def all(self):
+        return self
+
+    def result(self):
+        return self._result
+
+
+class StubGremlinClient:
+    """Records submitted traversals; like gremlinpython's transport, refuses to run on an active event loop"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def submit(self, query, bindings=None):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("Cannot run the event loop while another loop is running")
+        with self.lock:
+            self.calls.append((query, dict(bindings or {})))
+        return StubResultSet([])
+
+
+def make_product(product_id, variants=1, images=1):
+    return {
+        'id': product_id,
+        'title': f"Product {product_id}",
+        'handle': f"product-{product_id}",
+        'variants': [{'id': product_id * 100 + i, 'price': '10.0'} for i in range(variants)],
+        'images': [{'id': product_id * 1000 + i} for i in range(images)],
+    }
+
+
+def test_empty_batch_binds_only_the_partition_key():
+    batch = loader.TraversalBatch()
+    assert batch.query() == 'g'
+    assert batch.bindings == {'pk': loader.PARTITION_KEY}
+
+
+def test_add_product_builds_one_fused_traversal():
+    batch = loader.TraversalBatch()
+    loader.add_product(batch, make_product(1, variants=2, images=1))
+
+    # product + 2 variants + 1 image, plus one edge per variant/image
+    assert batch.objects == 7
+    assert batch.products == [(make_product(1, variants=2, images=1), 2, 1)]
+    query = batch.query()
+    assert query.count("addV('product')") == 1
+    assert query.count("addV('variant')") == 2
+    assert query.count("addV('image')") == 1
+    assert query.count("addE('has_variant').from(g.V(id_0))") == 2
+    assert query.count("addE('has_image').from(g.V(id_0))") == 1
+    assert batch.bindings['id_0'] == '1'
+    assert batch.bindings['id_1'] == '100'
+    assert batch.bindings['product_id_1'] == '1'
+
+
+def test_add_product_binding_names_are_unique_across_products():
+    batch = loader.TraversalBatch()
+    loader.add_product(batch, make_product(1))
+    loader.add_product(batch, make_product(2))
+
+    assert batch.bindings['id_0'] == '1'
+    # The second product starts after the first product's vertex, variant, image and two edges
+    assert batch.bindings['id_5'] == '2'
+    assert "addE('has_variant').from(g.V(id_5))" in batch.query()
+
+
+def test_add_product_omits_empty_optional_fields():
+    product = make_product(1)
+    product.update(product_type='', tags=['a', 'b'])
+    batch = loader.TraversalBatch()
+    loader.add_product(batch, product)
+
+    assert 'product_type_0' not in batch.bindings
+    assert batch.bindings['tags_0'] == 'a,b'
+
+
+def test_load_products_submits_off_the_event_loop():
+    gremlin_client = StubGremlinClient()
+    products = [make_product(i) for i in range(1, 40)]
+    results = []
+
+    loaded = loader.load_products(
+        gremlin_client, products, lambda product, *rest: results.append((product['id'],) + rest), concurrency=4
+    )
+
+    assert loaded == len(products)
+    assert sorted(product_id for product_id, *_ in results) == list(range(1, 40))
+    assert all(error is None for *_, error in results)
+    # Products are grouped into batched traversals, not one submit each
+    assert len(gremlin_client.calls) < len(products)
+
+
+def test_load_products_reports_malformed_products():
+    gremlin_client = StubGremlinClient()
+    results = []
+
+    loaded = loader.load_products(
+        gremlin_client, [make_product(1), {'id': 2}], lambda product, *rest: results.append(rest), concurrency=2
+    )
+
+    assert loaded == 1
+    errors = [error for *_, error in results if error is not None]
+    assert len(errors) == 1 and isinstance(errors[0], KeyError)
+
+
+def test_checkpoint_path_is_keyed_on_dataset_and_graph(monkeypatch, tmp_path):
+    monkeypatch.setenv('COSMOS_GRAPH', 'products')
+    small = loader.checkpoint_path(str(tmp_path / 'small.json'))
+    large = loader.checkpoint_path(str(tmp_path / 'large.json'))
+    monkeypatch.setenv('COSMOS_GRAPH', 'staging')
+
+    assert small != large
+    assert loader.checkpoint_path(str(tmp_path / 'small.json')) != small
+
+
+def test_checkpoint_only_skips_loaded_products_when_resuming(tmp_path):
+    path = str(tmp_path / 'checkpoint.txt')
+    products = [make_product(i) for i in (1, 2, 3)]
+
+    checkpoint = loader.Checkpoint(path)
+    checkpoint.record(products[0])
+    checkpoint.close()
+
+    resumed = loader.Checkpoint(path, resume=True)
+    assert [product['id'] for product in resumed.pending(products)] == [2, 3]
+    assert resumed.skipped == 1
+    resumed.close()
+
+    fresh = loader.Checkpoint(path)
+    assert [product['id'] for product in fresh.pending(products)] == [1, 2, 3]
+    fresh.close()
+    assert open(path).read() == ''
+
+
+def gremlin_error(code, attributes):
+    return GremlinServerError({'code': code, 'message': 'error', 'attributes': attributes})
+
+
+def test_is_throttled_without_status_attributes():
+    assert not loader.is_throttled(gremlin_error(500, None))
+    assert loader.is_throttled(gremlin_error(429, None))
+    assert loader.is_throttled(gremlin_error(500, {'x-ms-status-code': 429}))
+    assert not loader.is_throttled(ValueError())
+
+
+def test_retry_delay_parses_hints_and_falls_back_to_backoff():
+    assert loader.retry_delay(gremlin_error(429, {'x-ms-retry-after-ms': '15'}), 0) == pytest.approx(0.015)
+    assert loader.retry_delay(gremlin_error(429, {'x-ms-retry-after-ms': '00:00:02'}), 0) == pytest.approx(2)
+    for attributes in (None, {'x-ms-retry-after-ms': 'soon'}):
+        delay = loader.retry_delay(gremlin_error(429, attributes), 1)
+        assert loader.RETRY_BASE_DELAY <= delay <= loader.RETRY_BASE_DELAY * 3
+
+
+class StubScripts:
+    def __init__(self, stored_procedures=()):
+        self.stored_procedures = list(stored_procedures)
+        self.created = []
+
+    def list_stored_procedures(self):
+        return self.stored_procedures
+
+    def list_triggers(self):
+        return []
+
+    def list_user_defined_functions(self):
+        return []
+
+    def create_stored_procedure(self, body):
+        self.created.append(body)
+
+
+class StubContainer:
+    def __init__(self, properties, scripts):
+        self.properties = properties
+        self.scripts = scripts
+
+    def read(self):
+        return self.properties
+
+    def get_throughput(self):
+        return SimpleNamespace(auto_scale_max_throughput=None, offer_throughput=400)
+
+
+class StubDatabase:
+    def __init__(self, container):
+        self.container = container
+        self.deleted = []
+        self.created = []
+
+    def get_container_client(self, name):
+        return self.container
+
+    def delete_container(self, name):
+        self.deleted.append(name)
+
+    def create_container(self, **settings):
+        self.created.append(settings)
+        return self.container
+
+
+@pytest.fixture
+def stub_database(monkeypatch):
+    """Install a stub SQL API client whose database holds one container with the given properties"""
+    monkeypatch.setenv('COSMOS_ENDPOINT', 'account.gremlin.cosmos.azure.com')
+    monkeypatch.setenv('COSMOS_DATABASE', 'db')
+    monkeypatch.setenv('COSMOS_GRAPH', 'graph')
+
+    def install(properties, scripts):
+        database = StubDatabase(StubContainer(properties, scripts))
+        cosmos = SimpleNamespace(get_database_client=lambda name: database)
+        monkeypatch.setattr(loader, 'SyncCosmosClient', lambda endpoint, credential: cosmos)
+        return database
+
+    return install
+
+
+def container_properties(**extra):
+    return {
+        'id': 'graph', '_rid': 'rid', '_etag': 'etag',
+        'partitionKey': {'paths': ['/tenant', '/partitionKey'], 'kind': 'MultiHash', 'version': 2},
+        'indexingPolicy': {'indexingMode': 'consistent'},
+        'geospatialConfig': {'type': 'Geography'},
+        **extra
+    }
+
+
+def test_recreate_graph_container_copies_settings_and_scripts(stub_database):
+    scripts = StubScripts([{'id': 'bulkDelete', 'body': 'function () {}', '_rid': 'x', '_etag': 'y'}])
+    database = stub_database(
+        container_properties(defaultTtl=3600, uniqueKeyPolicy={'uniqueKeys': [{'paths': ['/sku']}]}), scripts
+    )
+
+    loader.recreate_graph_container()
+
+    assert database.deleted == ['graph']
+    settings = database.created[0]
+    assert settings['default_ttl'] == 3600
+    assert settings['unique_key_policy'] == {'uniqueKeys': [{'paths': ['/sku']}]}
+    assert settings['indexing_policy'] == {'indexingMode': 'consistent'}
+    assert settings['offer_throughput'] == 400
+    assert settings['partition_key']['paths'] == ['/tenant', '/partitionKey']
+    assert settings['partition_key']['kind'] == 'MultiHash'
+    assert scripts.created == [{'id': 'bulkDelete', 'body': 'function () {}'}]
+
+
+def test_recreate_graph_container_refuses_settings_it_cannot_copy(stub_database):
+    database = stub_database(container_properties(clientEncryptionPolicy={'policyFormatVersion': 2}), StubScripts())
+
+    with pytest.raises(ValueError, match='clientEncryptionPolicy'):
+        loader.recreate_graph_container()
+    assert database.deleted == []
+
+
+def test_clear_graph_drops_vertices_unless_recreating_is_requested(stub_database, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    database = stub_database(container_properties(), StubScripts())
+    gremlin_client = StubGremlinClient()
+
+    loader.clear_graph(gremlin_client)
+    assert [query for query, _ in gremlin_client.calls] == [loader.CLEAR_GRAPH_QUERY]
+    assert database.deleted == []
+
+    loader.clear_graph(gremlin_client, recreate_container=True)
+    assert database.deleted == ['graph']
+    assert len(gremlin_client.calls) == 1
+
+
+def test_gremlin_and_bulk_loaders_share_edge_ids():
+    product = make_product(1, variants=2, images=1)
+    batch = loader.TraversalBatch()
+    loader.add_product(batch, product)
+    documents, _, _ = loader.product_documents(product)
+
+    gremlin_edge_ids = {value for name, value in batch.bindings.items() if name.startswith('eid_')}
+    bulk_edge_ids = {document['id'] for document in documents if document.get('_isEdge')}
+    assert gremlin_edge_ids == bulk_edge_ids == {'1-has_variant-100', '1-has_variant-101', '1-has_image-1000'}
+    assert batch.query().count(".hasId(eid_") == 3
+
+
+class StubAsyncContainer:
+    def __init__(self):
+        self.batches = []
+
+    async def execute_item_batch(self, operations, partition_key):
+        self.batches.append(operations)
+
+
+class StubAsyncCosmosClient:
+    def __init__(self, container):
+        self.container = container
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def get_database_client(self, name):
+        return SimpleNamespace(get_container_client=lambda name: self.container)
+
+
+def test_bulk_load_reads_products_off_the_event_loop(monkeypatch):
+    monkeypatch.setenv('COSMOS_ENDPOINT', 'account.gremlin.cosmos.azure.com')
+    container = StubAsyncContainer()
+    monkeypatch.setattr(loader, 'CosmosClient', lambda endpoint, credential: StubAsyncCosmosClient(container))
+
+    def products():
+        for i in range(1, 30):
+            # A streaming reader blocks on file I/O, so it must not run on the event loop
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            yield make_product(i)
+
+    results = []
+    loaded = loader.bulk_load_products(products(), lambda product, *rest: results.append(rest))
+
+    assert loaded == 29
+    assert all(error is None for *_, error in results)
+    assert sum(len(operations) for operations in container.batches) == 29 * 5